@@ -8,13 +8,20 @@ v2 changes:
   • Better fallback parsing
 """
 
+import bisect
 import random
 import re
-import time
-import traceback
-from dataclasses import dataclass, field, asdict
+from collections import deque
+from dataclasses import dataclass, field
+from functools import lru_cache
 
-from cot_templates import build_prompt
+import numpy as np
+
+from cot_templates import (
+    build_join_prompt, build_lead_prompt, build_prompt, build_thread_prompts,
+    lead_steps, thread_steps,
+)
+from dataset_writer import open_record_stream, write_record
 from model_manager import ModelManager
 
 
@@ -31,9 +38,14 @@ LANGUAGE_MAP = {
 }
 
 
-@dataclass
+@dataclass(slots=True)
 class SynthRecord:
-    """One record in the output dataset (mirrors PleIAs/SYNTH columns)."""
+    """
+    One record in the output dataset (mirrors PleIAs/SYNTH columns).
+
+    Schema reference only: generate_cot_batch emits plain dicts with
+    these keys in this order.
+    """
     synth_id: str = ""
     language: str = "en"
     exercise: str = ""
@@ -73,87 +85,177 @@ def sample_max_tokens(model_cfg: dict, ctx_profiles: dict, ctx_mode: str,
       'fixed'   → always use fallback
       'long_cot'→ use model's max_cot
     """
+    return sample_max_tokens_batch(
+        model_cfg, ctx_profiles, ctx_mode, 1, fallback
+    )[0]
+
+
+def sample_max_tokens_batch(model_cfg: dict, ctx_profiles: dict,
+                            ctx_mode: str, n: int,
+                            fallback: int = 2048) -> list[int]:
+    """Draw `n` token budgets at once (same modes as sample_max_tokens)."""
     if ctx_mode == "fixed":
-        return fallback
+        return [fallback] * n
 
     if ctx_mode == "long_cot":
-        return model_cfg.get("max_cot", fallback)
+        return [model_cfg.get("max_cot", fallback)] * n
 
     # profile mode
     size_class = model_cfg.get("size_class", "8b")
     profile = ctx_profiles.get(size_class)
 
     if not profile:
-        return fallback
-
-    # profile is { token_count: probability }
-    buckets = list(profile.keys())
-    weights = list(profile.values())
+        return [fallback] * n
 
-    # buckets may be int or str — normalise
-    buckets = [int(b) for b in buckets]
+    # profile is { token_count: probability }; buckets may be int or str
+    buckets = np.array([int(b) for b in profile], dtype=np.int64)
+    weights = np.array(list(profile.values()), dtype=np.float64)
 
-    chosen = random.choices(buckets, weights=weights, k=1)[0]
+    # Seeded from `random` so random.seed() still makes runs reproducible
+    rng = np.random.default_rng(random.getrandbits(64))
+    chosen = rng.choice(buckets, size=n, p=weights / weights.sum())
 
     # clamp to model's max_cot
     max_cot = model_cfg.get("max_cot", 8192)
-    return min(chosen, max_cot)
+    return np.minimum(chosen, max_cot).tolist()
+
+
+@dataclass
+class BudgetTracker:
+    """
+    Rolling record of how many tokens parsed completions actually used
+    (per skill). Once `warmup` samples are in, cap() trims first-attempt
+    budgets to `headroom` × the rolling mean — never below `floor` —
+    since the profile often asks for far more than the CoT needs.
+    Retries run with the full budget, so a truncated CoT isn't lost.
+    """
+    window: int = 64
+    warmup: int = 8
+    headroom: float = 2.0
+    floor: int = 0
+    _seen: deque = field(init=False, repr=False)
+
+    def __post_init__(self):
+        self._seen = deque(maxlen=self.window)
+
+    def observe(self, tokens: int) -> None:
+        self._seen.append(tokens)
+
+    def cap(self, budget: int) -> int:
+        if len(self._seen) < self.warmup:
+            return budget
+        mean = sum(self._seen) / len(self._seen)
+        return min(budget, max(self.floor, int(self.headroom * mean)))
+
+
+# Upper edges of the max_new_tokens buckets used to split a batch into
+# sub-batches of similar length (anything larger lands in a final bucket).
+TOKEN_BUCKET_EDGES = (512, 1536, 4096)
+
+
+def bucket_by_budget(indices: list[int], budgets: list[int]) -> list[list[int]]:
+    """Split seed indices into sub-batches of similar max_new_tokens."""
+    buckets: list[list[int]] = [[] for _ in range(len(TOKEN_BUCKET_EDGES) + 1)]
+    for i in indices:
+        buckets[bisect.bisect_left(TOKEN_BUCKET_EDGES, budgets[i])].append(i)
+    return [b for b in buckets if b]
 
 
 # ── Parsing helpers ─────────────────────────────────────────
 
-RE_REASONING = re.compile(
-    r"<reasoning>(.*?)</reasoning>", re.DOTALL | re.IGNORECASE
-)
-RE_ANSWER = re.compile(
-    r"<answer>(.*?)</answer>", re.DOTALL | re.IGNORECASE
-)
-# Also handle <think> tags from DeepSeek-R1 models
-RE_THINK = re.compile(
-    r"<think>(.*?)</think>", re.DOTALL | re.IGNORECASE
+# google-re2 (optional) compiles to a DFA and scans in linear time; the
+# patterns below stick to syntax both engines accept (no backreferences).
+try:
+    import re2 as _re_engine
+except ImportError:
+    _re_engine = re
+
+# One pass over the raw text finds every <reasoning>, <answer> and
+# <think> (DeepSeek-R1 native) block; the group that matched names it.
+RE_TAGS = _re_engine.compile(
+    r"(?is)<reasoning>(.*?)</reasoning>"
+    r"|<answer>(.*?)</answer>"
+    r"|<think>(.*?)</think>"
 )
+_TAG_GROUPS = {1: "reasoning", 2: "answer", 3: "think"}
+RE_ANSWER_TAG = re.compile(r"</?answer>")
+ANSWER_STOP = "</answer>"
+THREAD_STOP = "</Thread>"
+RE_THREAD_TAG = re.compile(r"</?Thread>")
+RE_ANSWER_LABEL = _re_engine.compile(r"(?i)(?:final\s+)?answer\s*:")
 
 
 def parse_response(raw: str) -> tuple[str, str]:
     """Extract reasoning and answer blocks. Supports multiple tag formats."""
     reasoning, answer = "", ""
 
-    # Try <reasoning>/<answer> first
-    m_r = RE_REASONING.search(raw)
-    m_a = RE_ANSWER.search(raw)
+    # First block of each kind wins
+    blocks = {}
+    for m in RE_TAGS.finditer(raw):
+        blocks.setdefault(_TAG_GROUPS[m.lastindex], m)
 
-    if m_r:
-        reasoning = m_r.group(1).strip()
-    if m_a:
-        answer = m_a.group(1).strip()
+    # Try <reasoning>/<answer> first
+    if "reasoning" in blocks:
+        reasoning = blocks["reasoning"].group(1).strip()
+    if "answer" in blocks:
+        answer = blocks["answer"].group(2).strip()
 
     # Try <think> tag (DeepSeek-R1 native)
-    if not reasoning:
-        m_t = RE_THINK.search(raw)
-        if m_t:
-            reasoning = m_t.group(1).strip()
-            # answer is everything after </think>
-            after_think = raw[m_t.end():].strip()
-            if not answer and after_think:
-                # strip any remaining tags
-                answer = re.sub(r"</?answer>", "", after_think).strip()
-
-    # Fallback: heuristic split
+    if not reasoning and "think" in blocks:
+        m_t = blocks["think"]
+        reasoning = m_t.group(3).strip()
+        # answer is everything after </think>
+        after_think = raw[m_t.end():].strip()
+        if not answer and after_think:
+            # strip any remaining tags
+            answer = RE_ANSWER_TAG.sub("", after_think).strip()
+
+    # Fallback: explicit "Answer:" label. Anything without structure stays
+    # empty so the caller retries it rather than keeping a made-up split.
     if not reasoning and not answer:
-        parts = re.split(r"(?i)(?:final\s+)?answer\s*:", raw, maxsplit=1)
+        parts = RE_ANSWER_LABEL.split(raw, maxsplit=1)
         if len(parts) == 2:
             reasoning = parts[0].strip()
             answer = parts[1].strip()
-        else:
-            split_point = int(len(raw) * 0.7)
-            reasoning = raw[:split_point].strip()
-            answer = raw[split_point:].strip()
 
     return reasoning, answer
 
 
+def _chat(sys_msg: str, usr_msg: str) -> list[dict]:
+    return [
+        {"role": "system", "content": sys_msg},
+        {"role": "user", "content": usr_msg},
+    ]
+
+
+@lru_cache(maxsize=None)
+def _script_tag(skill_id: str, cot_style: str) -> str:
+    return f"skill={skill_id} cot={cot_style}"
+
+
+# Whitespace lookup (same set as str.split) indexed by code point; every
+# whitespace character sits below U+3001, so larger points clamp to a
+# non-space sentinel slot.
+_WS_LIMIT = 0x3001
+_IS_WS = np.array([chr(c).isspace() for c in range(_WS_LIMIT)] + [False])
+# Below this length str.split() is cheaper than the array setup
+_COUNT_WORDS_MIN_LEN = 2048
+
+
 def count_words(text: str) -> int:
-    return len(text.split())
+    """
+    Word count as len(text.split()), without building the word list for
+    long texts: count the non-space characters that follow a space.
+    """
+    if len(text) < _COUNT_WORDS_MIN_LEN:
+        return len(text.split())
+    if text.isascii():
+        cps = np.frombuffer(text.encode("ascii"), dtype=np.uint8)
+    else:
+        cps = np.frombuffer(text.encode("utf-32-le"), dtype=np.uint32)
+        cps = np.minimum(cps, _WS_LIMIT)
+    ws = _IS_WS[cps]
+    return int(np.count_nonzero(ws[:-1] & ~ws[1:])) + (not ws[0])
 
 
 # ── Main generator ──────────────────────────────────────────
@@ -165,104 +267,318 @@ def generate_cot_batch(
     gen_settings: dict,
     ctx_profiles: dict,
     verifier_cfg: dict | None = None,
+    out_path: str | None = None,
+    budget: BudgetTracker | None = None,
 ) -> list[dict]:
     """
     Generate COT records for a batch of seeds.
     Each seed gets a RANDOM max_new_tokens from the model's ctx_profile.
+    All prompts are handed to the manager as one batch and parsed as each
+    result arrives; seeds that fail to parse are re-batched together on
+    the next attempt.
+
+    If `out_path` is given (the run's checkpoint), each record is appended
+    there (JSONL) as soon as its response parses and none are returned,
+    so a crash loses at most the record in flight. With a verifier the
+    batch is kept until it is verified, then written.
+    A `budget` tracker caps first-attempt token budgets by the lengths it
+    has seen, and learns from this batch.
     """
     mgr.load(model_cfg)
     records = []
     max_retries = gen_settings.get("max_retries", 2)
     ctx_mode = gen_settings.get("ctx_mode", "profile")
     fallback_tokens = gen_settings.get("fallback_max_new_tokens", 2048)
-
-    for i, seed in enumerate(seeds):
-        # Sample context length for THIS seed
-        max_tokens = sample_max_tokens(
-            model_cfg, ctx_profiles, ctx_mode, fallback_tokens
+    sampling = {
+        "temperature": gen_settings.get("temperature", 0.7),
+        "top_p": gen_settings.get("top_p", 0.9),
+        "top_k": gen_settings.get("top_k", 50),
+        "repetition_penalty": gen_settings.get("repetition_penalty", 1.1),
+        # Nothing after the answer block is kept, so don't decode it
+        "stop": [ANSWER_STOP],
+    }
+
+    # ── Pass 1: build every prompt + token budget up front ──
+    # Every seed's context length in one draw
+    budgets = sample_max_tokens_batch(
+        model_cfg, ctx_profiles, ctx_mode, len(seeds), fallback_tokens
+    )
+    # Expand language codes to full names for prompt quality (the seeds
+    # themselves are left alone so callers can reuse them)
+    lang_names = [
+        LANGUAGE_MAP.get(code, code)
+        for code in (seed.get("language", "en") for seed in seeds)
+    ]
+    all_messages = [
+        _chat(*build_prompt(seed["cot_style"], seed, language=lang))
+        for seed, lang in zip(seeds, lang_names)
+    ]
+
+    # ── Pass 2: one batched generate, re-batch only failures ─
+    parsed = [("", "")] * len(seeds)
+    gen_times = [0.0] * len(seeds)
+    prefixes = [""] * len(seeds)
+    thread_times = [0.0] * len(seeds)
+    thread_tokens = [0] * len(seeds)
+    if gen_settings.get("parallel_outline", False):
+        _run_threads(
+            seeds, lang_names, all_messages, budgets, prefixes,
+            thread_times, thread_tokens, mgr, sampling,
         )
-
+    pending = list(range(len(seeds)))
+    # Budgets actually requested; retries go back to the full budgets
+    used = (
+        [budget.cap(b) for b in budgets] if budget is not None
+        else list(budgets)
+    )
+
+    # ── Pass 3: build each record as its response parses ───
+    verify = bool(verifier_cfg) and verifier_cfg["id"] != model_cfg["id"]
+    # Streamed records go out one at a time and are not kept; a batch
+    # that still has to be verified is written once that is done.
+    stream = open_record_stream(out_path) if out_path and not verify else None
+    model_id = model_cfg["id"]
+    done = 0
+
+    def emit(i: int) -> None:
+        nonlocal done
+        seed = seeds[i]
+        reasoning, answer = parsed[i]
+        if prefixes[i] and reasoning:
+            reasoning = prefixes[i] + "\n\n" + reasoning
+        # Every call's budget: lead + threads + the final (join) prompt
+        max_tokens = used[i] + thread_tokens[i]
+        gen_time = gen_times[i]
         cot_style = seed["cot_style"]
-        
-        # Expand language code to full name for prompt quality
-        lang_code = seed.get("language", "en")
-        seed["language"] = LANGUAGE_MAP.get(lang_code, lang_code)
-        
-        sys_msg, usr_msg = build_prompt(cot_style, seed)
-
-        messages = [
-            {"role": "system", "content": sys_msg},
-            {"role": "user", "content": usr_msg},
-        ]
-
-        raw = ""
-        reasoning, answer = "", ""
-        gen_time = 0.0
-
-        for attempt in range(1, max_retries + 1):
-            try:
-                t0 = time.time()
-                raw = mgr.generate(
-                    messages,
-                    max_new_tokens=max_tokens,
-                    temperature=gen_settings.get("temperature", 0.7),
-                    top_p=gen_settings.get("top_p", 0.9),
-                    top_k=gen_settings.get("top_k", 50),
-                    repetition_penalty=gen_settings.get(
-                        "repetition_penalty", 1.1
-                    ),
-                )
-                gen_time = time.time() - t0
-                reasoning, answer = parse_response(raw)
-                if reasoning and answer:
-                    break
-            except Exception:
-                traceback.print_exc()
-                time.sleep(1)
-
+        category = seed.get("category", "")
         total_words = count_words(reasoning) + count_words(answer)
 
-        rec = SynthRecord(
-            synth_id=seed["synth_id"],
-            language=seed.get("language", "en"),
-            exercise=seed.get("category", ""),
-            model=model_cfg["id"],
-            query=seed.get("query", ""),
-            query_seed_url=seed.get("seed_url", ""),
-            query_seed_text=seed.get("seed_text", ""),
-            constraints=seed.get("constraints", ""),
-            script=f"skill={seed['skill_id']} cot={cot_style}",
-            synthetic_reasoning=reasoning,
-            synthetic_answer=answer,
-            words=total_words,
-            max_new_tokens_used=max_tokens,
-            generation_time_s=round(gen_time, 1),
-            skill_id=seed["skill_id"],
-            category=seed.get("category", ""),
-            band=seed.get("band", []),
-            benchmarks=seed.get("benchmarks", []),
-            cot_style=cot_style,
-            stages=seed.get("stages", []),
-        )
-
-        records.append(asdict(rec))
+        # Plain dict in SynthRecord column order (no asdict() deep copy)
+        rec = {
+            "synth_id": seed["synth_id"],
+            "language": lang_names[i],
+            "exercise": category,
+            "model": model_id,
+            "query": seed.get("query", ""),
+            "query_seed_url": seed.get("seed_url", ""),
+            "query_seed_text": seed.get("seed_text", ""),
+            "additional_seed_url": "",
+            "seed_license": "synthetic",
+            "constraints": seed.get("constraints", ""),
+            "script": _script_tag(seed["skill_id"], cot_style),
+            "synthetic_reasoning": reasoning,
+            "synthetic_answer": answer,
+            "words": total_words,
+            "max_new_tokens_used": max_tokens,
+            "generation_time_s": round(gen_time, 1),
+            "skill_id": seed["skill_id"],
+            "category": category,
+            "band": seed.get("band", []),
+            "benchmarks": seed.get("benchmarks", []),
+            "cot_style": cot_style,
+            "stages": seed.get("stages", []),
+            "verified": False,
+            "verification_score": 0.0,
+        }
+        if stream is not None:
+            # Flushed per record: a crash loses at most the one in flight
+            write_record(stream, rec)
+            stream.flush()
+        else:
+            records.append(rec)
 
         # Per-seed progress with speed
+        done += 1
         wps = total_words / gen_time if gen_time > 0 else 0
         print(
-            f"  [{i+1}/{len(seeds)}] {rec.synth_id}  |  "
+            f"  [{done}/{len(seeds)}] {seed['synth_id']}  |  "
             f"{total_words} words  |  {max_tokens} tok budget  |  "
             f"{gen_time:.1f}s ({wps:.0f} w/s)  |  "
-            f"model={model_cfg['id']}"
+            f"model={model_id}"
         )
 
+    try:
+        for attempt in range(1, max_retries + 1):
+            if not pending:
+                break
+            if attempt > 1:
+                for i in pending:
+                    used[i] = budgets[i]
+            failed = []
+            # Similar-length requests go together so short ones don't sit
+            # idle behind the longest budget in the batch.
+            for bucket in bucket_by_budget(pending, used):
+                # Seeds sharing a system prompt (same cot_style + language)
+                # run back-to-back so the backend's prefix cache gets hits.
+                bucket.sort(key=lambda i: all_messages[i][0]["content"])
+                # Parse each result as it lands while the next one generates
+                for j, raw, stats in mgr.iter_generate_many_timed(
+                    [all_messages[i] for i in bucket],
+                    [{"max_new_tokens": used[i], **sampling} for i in bucket],
+                ):
+                    i = bucket[j]
+                    gen_times[i] = thread_times[i] + stats["gen_s"]
+                    parsed[i] = parse_response(raw) if raw else ("", "")
+                    if not (parsed[i][0] and parsed[i][1]):
+                        failed.append(i)
+                        continue
+                    if budget is not None and stats.get("tokens"):
+                        budget.observe(stats["tokens"])
+                    emit(i)
+            pending = sorted(failed)
+
+        if pending:
+            print(f"  [Parse] {len(pending)}/{len(seeds)} responses still "
+                  f"unparseable after {max_retries} attempt(s)")
+        # Unparseable seeds still get a (partial) record, as before
+        for i in pending:
+            emit(i)
+    finally:
+        if stream is not None:
+            stream.close()
+
     # ── Optional verification ───────────────────────────────
-    if verifier_cfg and verifier_cfg["id"] != model_cfg["id"]:
+    if verify:
         records = _verify_batch(records, verifier_cfg, mgr, gen_settings)
+        if out_path:
+            with open_record_stream(out_path) as f:
+                for rec in records:
+                    write_record(f, rec)
+            return []
 
     return records
 
 
+# ── Parallel-outline threads ───────────────────────────────
+
+def _run_threads(
+    seeds: list[dict],
+    lang_names: list[str],
+    all_messages: list[list[dict]],
+    budgets: list[int],
+    prefixes: list[str],
+    thread_times: list[float],
+    thread_tokens: list[int],
+    mgr: ModelManager,
+    sampling: dict,
+) -> None:
+    """
+    Generate the independent outline steps of parallel styles as separate
+    completions (one batch across all seeds), then swap each seed's prompt
+    for the join prompt so the main pass only writes the steps after them.
+    Steps before the threads (the lead) are generated first, in one batch,
+    and given to the threads as context; `prefixes` gets lead + threads in
+    outline order. The lead, threads and join split the seed's budget:
+    `thread_tokens` gets the tokens requested for the lead and threads,
+    and a seed's entry in `budgets` is cut to the join's remaining share.
+    Seeds with a step that comes back empty keep their normal prompt (and
+    full budget).
+    """
+    def run(jobs, msgs, params):
+        """Generate one batch; finished step texts per (seed, slot)."""
+        out: dict[int, list[str]] = {}
+        for j, raw, stats in mgr.iter_generate_many_timed(msgs, params):
+            i, k, n = jobs[j]
+            out.setdefault(i, [""] * n)[k] = RE_THREAD_TAG.sub("", raw).strip()
+            thread_times[i] += stats["gen_s"]
+            thread_tokens[i] += params[j]["max_new_tokens"]
+        return out
+
+    parallel = [
+        i for i, seed in enumerate(seeds) if thread_steps(seed["cot_style"])
+    ]
+    if not parallel:
+        return
+
+    # Lead, threads and join share the seed's budget
+    share = {
+        i: max(256, budgets[i] // (
+            len(thread_steps(seeds[i]["cot_style"])) + 1
+            + bool(lead_steps(seeds[i]["cot_style"]))
+        ))
+        for i in parallel
+    }
+    def params_for(i: int) -> dict:
+        return {"max_new_tokens": share[i], **sampling, "stop": [THREAD_STOP]}
+
+    # ── Lead steps (e.g. "define the conflict") ─────────────
+    leads: dict[int, list[str]] = {}
+    jobs, msgs, params = [], [], []
+    for i in parallel:
+        seed = seeds[i]
+        prompt = build_lead_prompt(seed["cot_style"], seed, language=lang_names[i])
+        if prompt is None:
+            leads[i] = []
+            continue
+        jobs.append((i, 0, 1))
+        msgs.append(_chat(*prompt))
+        params.append(params_for(i))
+    if jobs:
+        for i, (text,) in run(jobs, msgs, params).items():
+            if text:
+                steps = lead_steps(seeds[i]["cot_style"])
+                leads[i] = [f"{steps[0]}\n{text}"] if len(steps) == 1 else [text]
+
+    # ── Independent steps ───────────────────────────────────
+    jobs, msgs, params = [], [], []
+    for i, done in leads.items():
+        seed = seeds[i]
+        prompts = build_thread_prompts(
+            seed["cot_style"], seed, language=lang_names[i], done=done,
+        )
+        for k, prompt in enumerate(prompts):
+            jobs.append((i, k, len(prompts)))
+            msgs.append(_chat(*prompt))
+            params.append(params_for(i))
+    if not jobs:
+        return
+
+    for i, texts in run(jobs, msgs, params).items():
+        if not all(texts):
+            continue
+        seed = seeds[i]
+        steps = thread_steps(seed["cot_style"])
+        done = leads[i] + [
+            f"{step}\n{text}" for step, text in zip(steps, texts)
+        ]
+        all_messages[i] = _chat(*build_join_prompt(
+            seed["cot_style"], seed, done, language=lang_names[i],
+        ))
+        prefixes[i] = "\n\n".join(done)
+        budgets[i] = max(256, budgets[i] - thread_tokens[i])
+
+
+# Rubric is a constant system message so every verifier request shares
+# the same prefix; only the record itself goes in the user turn.
+VERIFIER_SYSTEM = (
+    "Rate the quality of the chain-of-thought reasoning 0-10.\n"
+    "Consider: logical correctness, completeness, clarity.\n"
+    "Respond with ONLY a number 0-10."
+)
+VERIFIER_PARAMS = {"max_new_tokens": 16, "temperature": 0.1, "top_p": 0.9}
+RE_SCORE = _re_engine.compile(r"(\d+(?:\.\d+)?)")
+
+
+def _clip(text: str, limit: int) -> str:
+    """Cut text to at most `limit` chars, backing off to a word boundary."""
+    if len(text) <= limit:
+        return text
+    cut = text.rfind(" ", 0, limit)
+    return text[:cut if cut > 0 else limit]
+
+
+def build_verifier_messages(rec: dict) -> list[dict]:
+    """Chat messages asking the verifier to score one record."""
+    return [
+        {"role": "system", "content": VERIFIER_SYSTEM},
+        {"role": "user", "content": (
+            f"Query: {rec['query']}\n\n"
+            f"Reasoning:\n{_clip(rec['synthetic_reasoning'], 2000)}\n\n"
+            f"Answer:\n{_clip(rec['synthetic_answer'], 500)}"
+        )},
+    ]
+
+
 def _verify_batch(
     records: list[dict],
     verifier_cfg: dict,
@@ -270,32 +586,29 @@ def _verify_batch(
     gen_settings: dict,
 ) -> list[dict]:
     """Ask a verifier model to score each COT trace (0-10)."""
-    mgr.load(verifier_cfg)
-    print(f"\n[Verifier] Scoring with {verifier_cfg['id']} ...")
-
-    for rec in records:
-        prompt = (
-            f"Rate the quality of this chain-of-thought reasoning 0-10.\n"
-            f"Consider: logical correctness, completeness, clarity.\n\n"
-            f"Query: {rec['query']}\n\n"
-            f"Reasoning:\n{rec['synthetic_reasoning'][:2000]}\n\n"
-            f"Answer:\n{rec['synthetic_answer'][:500]}\n\n"
-            f"Respond with ONLY a number 0-10."
-        )
-        messages = [{"role": "user", "content": prompt}]
-        try:
-            raw = mgr.generate(
-                messages,
-                max_new_tokens=16,
-                temperature=0.1,
-                top_p=0.9,
-            )
-            score = float(re.search(r"(\d+(?:\.\d+)?)", raw).group(1))
-            score = min(10.0, max(0.0, score))
-        except Exception:
-            score = -1.0
-
+    # Keep the verifier next to the generator when both fit, so the next
+    # batch doesn't pay a reload; otherwise this swaps the primary model.
+    resident = mgr.load_secondary(verifier_cfg)
+    print(f"\n[Verifier] Scoring with {verifier_cfg['id']} "
+          f"({'resident' if resident else 'swapped in'}) ...")
+
+    raws = mgr.generate_many_on(
+        verifier_cfg,
+        [build_verifier_messages(rec) for rec in records],
+        [VERIFIER_PARAMS] * len(records),
+    )
+
+    unparsed = 0
+    for rec, raw in zip(records, raws):
+        m = RE_SCORE.search(raw)
+        score = min(10.0, max(0.0, float(m.group(1)))) if m else -1.0
+        unparsed += m is None
         rec["verified"] = True
         rec["verification_score"] = score
 
+    # A quantized verifier that stops emitting clean scores shows up here
+    if unparsed:
+        print(f"[Verifier] {unparsed}/{len(records)} responses had no "
+              f"parseable score")
+
     return records
@@ -5,24 +5,54 @@ Each template takes a seed dict and returns a system + user prompt pair
 that elicits a structured chain-of-thought + final answer.
 """
 
-from jinja2 import Template
+from jinja2 import Environment
+
+# One shared environment: templates are compiled once at import and never
+# reloaded, so rendering skips any lexer/parser or cache bookkeeping.
+_ENV = Environment(
+    autoescape=False, cache_size=400, auto_reload=False, optimized=True,
+)
+_tpl = _ENV.from_string
 
 # ── Master wrapper (all COT styles share this envelope) ────
-ENVELOPE = Template("""\
-{{ system }}
+# Plain str.format templates: there is no logic in them, so Jinja would
+# only add overhead. (The system prompt is sent as its own message, which
+# is why the envelope opens on an empty first paragraph.)
+ENVELOPE = """\
+
 
-{{ user }}
+{user}
 
 Format your response EXACTLY as:
 
 <reasoning>
-{{ cot_instruction }}
+{cot_instruction}
 </reasoning>
 
 <answer>
 Your final, clean answer here.
-</answer>
-""")
+</answer>"""
+
+
+# Parallel-outline styles: the steps before the independent ones (the
+# "lead") are generated first, then each independent step ("thread") as
+# its own completion, then a join prompt finishes the steps after them —
+# so the stored reasoning stays in outline order.
+THREAD_ENVELOPE = """\
+{user}
+
+The reasoning for this task follows the outline below. The other steps
+are handled separately — work ONLY on {steps}.
+
+<Outlines>
+{cot_instruction}
+</Outlines>
+
+Write your reasoning for {steps} only and end it with </Thread>.
+
+<Thread>"""
+
+JOIN_HEADER = "Steps already worked out:"
 
 
 # ── Per-style COT instructions ─────────────────────────────
@@ -32,12 +62,12 @@ TEMPLATES: dict[str, dict] = {
     # ── Foundation ──────────────────────────────────────────
 
     "linguistic_parse": {
-        "system": Template(
+        "system": _tpl(
             "You are a linguist analysing {{ language }} text. "
             "Break down the sentence into morphemes, POS tags, dependency "
             "relations, and syntactic constituents. Use short notation."
         ),
-        "user": Template(
+        "user": _tpl(
             "Analyse this {{ language }} sentence:\n\n\"{{ seed_text }}\"\n\n"
             "Task: {{ query }}"
         ),
@@ -51,11 +81,11 @@ TEMPLATES: dict[str, dict] = {
     },
 
     "semantic_chain": {
-        "system": Template(
+        "system": _tpl(
             "You are an expert in semantics and pragmatics. "
             "Resolve meaning, coreference, and implicature step by step."
         ),
-        "user": Template(
+        "user": _tpl(
             "{{ query }}\n\nContext:\n{{ seed_text }}"
         ),
         "cot_instruction": (
@@ -70,12 +100,12 @@ TEMPLATES: dict[str, dict] = {
     # ── Reasoning ───────────────────────────────────────────
 
     "step_by_step_math": {
-        "system": Template(
+        "system": _tpl(
             "You are a maths tutor. Solve the problem with clear, "
             "numbered steps. Show all intermediate calculations. "
             "Verify your answer at the end."
         ),
-        "user": Template("{{ query }}"),
+        "user": _tpl("{{ query }}"),
         "cot_instruction": (
             "1. Restate the problem in your own words\n"
             "2. Identify knowns, unknowns, and constraints\n"
@@ -87,11 +117,11 @@ TEMPLATES: dict[str, dict] = {
     },
 
     "deductive_chain": {
-        "system": Template(
+        "system": _tpl(
             "You are a logician. Derive the conclusion using formal "
             "or semi-formal deductive reasoning. Mark each inference rule."
         ),
-        "user": Template(
+        "user": _tpl(
             "{{ query }}\n\n{% if seed_text %}Premises:\n{{ seed_text }}{% endif %}"
         ),
         "cot_instruction": (
@@ -104,12 +134,12 @@ TEMPLATES: dict[str, dict] = {
     },
 
     "causal_graph": {
-        "system": Template(
+        "system": _tpl(
             "You are an expert in causal reasoning. Trace cause-effect "
             "chains, distinguish correlation from causation, and identify "
             "confounders."
         ),
-        "user": Template("{{ query }}\n\nContext:\n{{ seed_text }}"),
+        "user": _tpl("{{ query }}\n\nContext:\n{{ seed_text }}"),
         "cot_instruction": (
             "1. Identify candidate cause(s) and effect(s)\n"
             "2. Trace the causal chain: A → B → C …\n"
@@ -120,11 +150,11 @@ TEMPLATES: dict[str, dict] = {
     },
 
     "mapping_chain": {
-        "system": Template(
+        "system": _tpl(
             "You are an expert in analogical reasoning. Map structural "
             "relations between source and target domains."
         ),
-        "user": Template("{{ query }}"),
+        "user": _tpl("{{ query }}"),
         "cot_instruction": (
             "1. Identify source domain entities and relations\n"
             "2. Identify target domain entities and relations\n"
@@ -137,11 +167,11 @@ TEMPLATES: dict[str, dict] = {
     # ── Generation ──────────────────────────────────────────
 
     "compression_trace": {
-        "system": Template(
+        "system": _tpl(
             "You are a summarisation expert. Produce a concise abstractive "
             "summary. Show your selection and compression reasoning."
         ),
-        "user": Template(
+        "user": _tpl(
             "Summarise the following text in {{ constraints }}:\n\n{{ seed_text }}"
         ),
         "cot_instruction": (
@@ -154,11 +184,11 @@ TEMPLATES: dict[str, dict] = {
     },
 
     "rewrite_trace": {
-        "system": Template(
+        "system": _tpl(
             "You are a paraphrasing expert. Rewrite the text preserving "
             "meaning but changing surface form. Show your rewrite decisions."
         ),
-        "user": Template(
+        "user": _tpl(
             "Paraphrase this:\n\n\"{{ seed_text }}\"\n\n{{ query }}"
         ),
         "cot_instruction": (
@@ -171,11 +201,11 @@ TEMPLATES: dict[str, dict] = {
     },
 
     "narrative_plan": {
-        "system": Template(
+        "system": _tpl(
             "You are a creative writer. Plan and write a short piece "
             "based on the prompt. Show your narrative planning."
         ),
-        "user": Template("{{ query }}\n\n{% if constraints %}Constraints: {{ constraints }}{% endif %}"),
+        "user": _tpl("{{ query }}\n\n{% if constraints %}Constraints: {{ constraints }}{% endif %}"),
         "cot_instruction": (
             "1. Interpret the prompt — theme, tone, scope\n"
             "2. Outline structure (beginning → conflict → resolution)\n"
@@ -188,11 +218,11 @@ TEMPLATES: dict[str, dict] = {
     # ── Applied ─────────────────────────────────────────────
 
     "retrieval_reason": {
-        "system": Template(
+        "system": _tpl(
             "You are an expert at answering questions using provided sources. "
             "Ground every claim in the sources. Use [quote] notation for citations."
         ),
-        "user": Template(
+        "user": _tpl(
             "Question: {{ query }}\n\nSources:\n{{ seed_text }}"
         ),
         "cot_instruction": (
@@ -205,11 +235,11 @@ TEMPLATES: dict[str, dict] = {
     },
 
     "label_reason": {
-        "system": Template(
+        "system": _tpl(
             "You are a text classification expert. Assign the correct label "
             "and explain your reasoning using textual evidence."
         ),
-        "user": Template(
+        "user": _tpl(
             "Classify the following text into one of: {{ constraints }}\n\n"
             "Text: \"{{ seed_text }}\""
         ),
@@ -223,11 +253,11 @@ TEMPLATES: dict[str, dict] = {
     },
 
     "span_trace": {
-        "system": Template(
+        "system": _tpl(
             "You are a named entity recognition expert. Identify and classify "
             "all named entities in the text."
         ),
-        "user": Template(
+        "user": _tpl(
             "Extract all named entities from:\n\n\"{{ seed_text }}\"\n\n"
             "Entity types: {{ constraints }}"
         ),
@@ -241,11 +271,11 @@ TEMPLATES: dict[str, dict] = {
     },
 
     "alignment_trace": {
-        "system": Template(
+        "system": _tpl(
             "You are a professional translator between {{ language }} and English. "
             "Show your translation decisions explicitly, especially regarding cultural nuances."
         ),
-        "user": Template(
+        "user": _tpl(
             "Translate:\n\n\"{{ seed_text }}\"\n\n{{ query }}"
         ),
         "cot_instruction": (
@@ -260,11 +290,11 @@ TEMPLATES: dict[str, dict] = {
     # ── Advanced Domains ──────────────────────────────────
     
     "scientific_method": {
-        "system": Template(
+        "system": _tpl(
             "You are a scientist explaining a phenomenon in {{ language }}. "
             "Follow the scientific method: observation, hypothesis, experiment, analysis, and conclusion."
         ),
-        "user": Template("{{ query }}\n\nContext:\n{{ seed_text }}"),
+        "user": _tpl("{{ query }}\n\nContext:\n{{ seed_text }}"),
         "cot_instruction": (
             "1. Formulate a specific hypothesis based on the query\n"
             "2. Identify variables (independent, dependent, control)\n"
@@ -275,11 +305,11 @@ TEMPLATES: dict[str, dict] = {
     },
 
     "legal_analysis": {
-        "system": Template(
+        "system": _tpl(
             "You are a legal expert specializing in Indian Law. "
             "Analyze the situation using the IRAC method (Issue, Rule, Analysis, Conclusion)."
         ),
-        "user": Template("{{ query }}\n\nCase Details:\n{{ seed_text }}"),
+        "user": _tpl("{{ query }}\n\nCase Details:\n{{ seed_text }}"),
         "cot_instruction": (
             "1. Identify the core legal Issue(s)\n"
             "2. State the applicable Rule(s) (statutes, IPC sections, precedents)\n"
@@ -290,11 +320,11 @@ TEMPLATES: dict[str, dict] = {
     },
 
     "ethical_framework": {
-        "system": Template(
+        "system": _tpl(
             "You are a philosopher analyzing an ethical dilemma. "
             "Provide a balanced view using multiple ethical frameworks (Utilitarianism, Deontology, Virtue Ethics)."
         ),
-        "user": Template("Scenario:\n{{ seed_text }}\n\nTask: {{ query }}"),
+        "user": _tpl("Scenario:\n{{ seed_text }}\n\nTask: {{ query }}"),
         "cot_instruction": (
             "1. Define the ethical conflict and stakeholders\n"
             "2. Evaluate through a Utilitarian lens (consequences, happiness)\n"
@@ -302,14 +332,16 @@ TEMPLATES: dict[str, dict] = {
             "4. Evaluate through a Virtue Ethics lens (character, wisdom)\n"
             "5. Summarize the trade-offs and suggest a path forward"
         ),
+        # The three lenses don't depend on each other
+        "threads": (2, 3, 4),
     },
 
     "code_reasoning": {
-        "system": Template(
+        "system": _tpl(
             "You are a senior software engineer. "
             "Think algorithmically, explain logic step-by-step, and ensure code quality."
         ),
-        "user": Template("Task: {{ query }}\n\n{% if seed_text %}Code/Context:\n{{ seed_text }}{% endif %}"),
+        "user": _tpl("Task: {{ query }}\n\n{% if seed_text %}Code/Context:\n{{ seed_text }}{% endif %}"),
         "cot_instruction": (
             "1. Deconstruct the problem into sub-tasks\n"
             "2. Choose optimal data structures and algorithms\n"
@@ -320,11 +352,11 @@ TEMPLATES: dict[str, dict] = {
     },
 
     "analytical_reasoning": {
-        "system": Template(
+        "system": _tpl(
             "You are a strategic analyst. "
             "Break down complex systems, identify levers of change, and predict outcomes."
         ),
-        "user": Template("Analyze this: {{ query }}\n\nContext:\n{{ seed_text }}"),
+        "user": _tpl("Analyze this: {{ query }}\n\nContext:\n{{ seed_text }}"),
         "cot_instruction": (
             "1. Define the scope and objective of analysis\n"
             "2. Identify key components and their interdependencies\n"
@@ -335,11 +367,11 @@ TEMPLATES: dict[str, dict] = {
     },
 
     "evidence_chain": {
-        "system": Template(
+        "system": _tpl(
             "You are a fact-checker and investigative analyst. "
             "Trace the origins of claims and evaluate evidence reliability."
         ),
-        "user": Template("Claim to verify: {{ query }}\n\nEvidence provided:\n{{ seed_text }}"),
+        "user": _tpl("Claim to verify: {{ query }}\n\nEvidence provided:\n{{ seed_text }}"),
         "cot_instruction": (
             "1. Break the claim into verifiable sub-claims\n"
             "2. Cross-reference with the provided evidence / known facts\n"
@@ -351,15 +383,137 @@ TEMPLATES: dict[str, dict] = {
 }
 
 
-def build_prompt(cot_style: str, seed: dict) -> tuple[str, str]:
-    """Build (system_msg, user_msg) from a COT style and seed dict."""
+# ── Precomputed per-style pieces ───────────────────────────
+# The envelope only varies in the user text once a style is fixed, so it
+# is rendered once per style and split around a marker; build_prompt then
+# just concatenates. User templates that are exactly "{{ query }}" are
+# detected by rendering them with marker values and skipped at call time.
+
+_MARK = "\x00USER\x00"
+_OTHER = "\x00OTHER\x00"
+
+
+def _precompile(t: dict) -> None:
+    head, _, tail = ENVELOPE.format(
+        user=_MARK, cot_instruction=t["cot_instruction"],
+    ).partition(_MARK)
+    t["_envelope_head"] = head
+    t["_envelope_tail"] = tail
+    probe = t["user"].render(
+        query=_MARK, seed_text=_OTHER, language=_OTHER, constraints=_OTHER,
+    )
+    t["_user_is_query"] = probe == _MARK
+    threads = t.get("threads", ())
+    if threads and list(threads) != list(range(threads[0], threads[-1] + 1)):
+        # Steps between threads would have to be written by the join,
+        # out of outline order
+        raise ValueError(f"threads must be consecutive outline steps: {threads}")
+
+
+for _t in TEMPLATES.values():
+    _precompile(_t)
+
+
+def _context(seed: dict, language: str | None) -> dict:
+    """Seed as template context, with an optional language override."""
+    return seed if language is None else {**seed, "language": language}
+
+
+def _render_user(t: dict, seed: dict) -> str:
+    if t["_user_is_query"]:
+        return str(seed.get("query", ""))
+    return t["user"].render(seed)
+
+
+def build_prompt(
+    cot_style: str, seed: dict, language: str | None = None,
+) -> tuple[str, str]:
+    """
+    Build (system_msg, user_msg) from a COT style and seed dict.
+    `language` replaces seed["language"] in the prompt without touching
+    the seed itself.
+    """
+    t = TEMPLATES[cot_style]
+    seed = _context(seed, language)
+    sys_msg = t["system"].render(seed)
+    usr_msg = _render_user(t, seed)
+    full_user = t["_envelope_head"] + usr_msg + t["_envelope_tail"]
+    return sys_msg, full_user
+
+
+def thread_steps(cot_style: str) -> list[str]:
+    """Outline lines of a style's independent steps ([] if not parallel)."""
+    t = TEMPLATES[cot_style]
+    lines = t["cot_instruction"].split("\n")
+    return [lines[n - 1] for n in t.get("threads", ())]
+
+
+def lead_steps(cot_style: str) -> list[str]:
+    """Outline lines before a parallel style's first thread."""
+    t = TEMPLATES[cot_style]
+    threads = t.get("threads", ())
+    if not threads:
+        return []
+    return t["cot_instruction"].split("\n")[:threads[0] - 1]
+
+
+def _with_done(usr_msg: str, done: list[str] | None) -> str:
+    """User message plus the steps already worked out, if any."""
+    if not done:
+        return usr_msg
+    return usr_msg + "\n\n" + JOIN_HEADER + "\n\n" + "\n\n".join(done)
+
+
+def _thread_prompt(t: dict, seed: dict, steps: str, done=None) -> tuple[str, str]:
+    return t["system"].render(seed), THREAD_ENVELOPE.format(
+        user=_with_done(_render_user(t, seed), done), steps=steps,
+        cot_instruction=t["cot_instruction"],
+    )
+
+
+def build_lead_prompt(
+    cot_style: str, seed: dict, language: str | None = None,
+) -> tuple[str, str] | None:
+    """(system_msg, user_msg) for the steps before the threads, or None."""
+    n = len(lead_steps(cot_style))
+    if not n:
+        return None
+    steps = "step 1" if n == 1 else f"steps 1-{n}"
+    return _thread_prompt(TEMPLATES[cot_style], _context(seed, language), steps)
+
+
+def build_thread_prompts(
+    cot_style: str, seed: dict, language: str | None = None,
+    done: list[str] | None = None,
+) -> list[tuple[str, str]]:
+    """
+    One (system_msg, user_msg) per independent outline step; `done` holds
+    the finished lead steps, given to every thread as context.
+    """
+    t = TEMPLATES[cot_style]
+    seed = _context(seed, language)
+    return [
+        _thread_prompt(t, seed, f"step {n}", done)
+        for n in t.get("threads", ())
+    ]
+
+
+def build_join_prompt(
+    cot_style: str, seed: dict, done: list[str],
+    language: str | None = None,
+) -> tuple[str, str]:
+    """
+    Build the final prompt once every thread is done: the finished steps
+    (lead and threads) are given as context and the envelope asks only
+    for the steps after the last thread.
+    """
     t = TEMPLATES[cot_style]
-    sys_msg = t["system"].render(**seed)
-    usr_msg = t["user"].render(**seed)
-    cot_instr = t["cot_instruction"]
-    full_user = ENVELOPE.render(
-        system="",  # system handled separately
-        user=usr_msg,
-        cot_instruction=cot_instr,
+    seed = _context(seed, language)
+    sys_msg = t["system"].render(seed)
+    last = t["threads"][-1]
+    remaining = t["cot_instruction"].split("\n")[last:]
+    full_user = ENVELOPE.format(
+        user=_with_done(_render_user(t, seed), done),
+        cot_instruction="\n".join(remaining),
     )
     return sys_msg, full_user
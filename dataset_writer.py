@@ -4,13 +4,42 @@ dataset_writer.py — Write generated records to Parquet / JSONL / HF.
 Output schema mirrors PleIAs/SYNTH with added skill metadata columns.
 """
 
+import itertools
 import json
 import os
+import threading
+from collections import Counter, defaultdict
 from pathlib import Path
+from typing import Iterable, Iterator
 
-import pandas as pd
+import numpy as np
 import pyarrow as pa
-import pyarrow.parquet as pq
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# JSONL files are written/read as bytes through a large buffer; orjson
+# produces UTF-8 bytes directly, json is the fallback.
+JSONL_BUFFER = 1 << 20
+
+# Encoders built once, configured exactly like the json.dumps calls they
+# replace so the output bytes are unchanged: list columns keep json.dumps'
+# default style; the JSONL fallback keeps non-ASCII unescaped.
+_dumps_list = json.JSONEncoder().encode
+_dumps = json.JSONEncoder(ensure_ascii=False).encode
+
+if orjson is not None:
+    def _jsonl_line(record: dict) -> bytes:
+        return orjson.dumps(record, option=orjson.OPT_APPEND_NEWLINE)
+
+    _json_loads = orjson.loads
+else:
+    def _jsonl_line(record: dict) -> bytes:
+        return (_dumps(record) + "\n").encode("utf-8")
+
+    _json_loads = json.loads
 
 
 # SYNTH-compatible schema
@@ -43,94 +72,281 @@ SCHEMA = pa.schema([
 ])
 
 
-def _serialise_lists(records: list[dict]) -> list[dict]:
-    """Convert list fields to JSON strings for Parquet storage."""
-    out = []
-    for r in records:
-        row = {**r}
-        for key in ("band", "benchmarks", "stages"):
-            val = row.get(key, [])
-            row[key] = json.dumps(val) if isinstance(val, list) else str(val)
-        out.append(row)
-    return out
+# Columns holding lists, stored as JSON strings in Parquet
+LIST_COLUMNS = ("band", "benchmarks", "stages")
+
+
+def _to_table(records: list[dict]) -> pa.Table:
+    """
+    Build the Arrow table column by column — one typed pa.array() per
+    schema field, no per-row inference — serialising list fields to JSON
+    strings on the way; records are not copied.
+    """
+    arrays = []
+    for field in SCHEMA:
+        name = field.name
+        if name in LIST_COLUMNS:
+            col = [
+                _dumps_list(v) if isinstance(v, list) else str(v)
+                for v in (r.get(name, []) for r in records)
+            ]
+        else:
+            col = [r.get(name) for r in records]
+        arrays.append(pa.array(col, type=field.type))
+    return pa.Table.from_arrays(arrays, schema=SCHEMA)
+
+
+# Low-cardinality columns worth dictionary-encoding in Parquet
+DICT_COLUMNS = [
+    "language", "exercise", "model", "seed_license", "script", "skill_id",
+    "category", "band", "benchmarks", "cot_style", "stages",
+]
+
+
+class RowGroupParquetWriter:
+    """
+    Write records to one Parquet file a row group at a time, so only one
+    chunk is ever converted to Arrow at once. Callers can feed batches as
+    they accumulate; close() (or the with-block) finalises the file.
+
+    Encoding/compressing a row group runs on a background thread (pyarrow
+    releases the GIL there) while the next chunk is converted to Arrow;
+    row groups are still written strictly in order.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        chunk_size: int = 50_000,
+        compression: str = "zstd",
+        compression_level: int | None = 3,
+    ):
+        import pyarrow.parquet as pq
+
+        self.path = path
+        self.chunk_size = chunk_size
+        self.rows = 0
+        self._writer = pq.ParquetWriter(
+            path, SCHEMA,
+            compression=compression,
+            compression_level=compression_level,
+            use_dictionary=DICT_COLUMNS,
+            data_page_size=1 << 20,
+            write_batch_size=8192,
+            write_statistics=True,
+        )
+        self._pending: threading.Thread | None = None
+        self._error: BaseException | None = None
+
+    def _write_table(self, table: pa.Table) -> None:
+        try:
+            self._writer.write_table(table)
+        except BaseException as e:
+            self._error = e
+
+    def _wait(self) -> None:
+        """Block until the in-flight row group is written; re-raise errors."""
+        if self._pending is not None:
+            self._pending.join()
+            self._pending = None
+        if self._error is not None:
+            err, self._error = self._error, None
+            raise err
+
+    def write(self, records: list[dict]) -> None:
+        for start in range(0, len(records), self.chunk_size):
+            chunk = records[start:start + self.chunk_size]
+            table = _to_table(chunk)
+            self._wait()
+            self._pending = threading.Thread(
+                target=self._write_table, args=(table,), daemon=True,
+            )
+            self._pending.start()
+            self.rows += len(chunk)
+
+    def close(self) -> None:
+        try:
+            self._wait()
+        finally:
+            self._writer.close()
 
+    def __enter__(self):
+        return self
 
-def save_parquet(records: list[dict], output_dir: str, shard_name: str = "synth_001") -> str:
-    """Save records as a single Parquet shard."""
+    def __exit__(self, *exc):
+        self.close()
+
+
+def save_parquet(
+    records: Iterable[dict],
+    output_dir: str,
+    shard_name: str = "synth_001",
+    compression: str = "zstd",
+    compression_level: int | None = 3,
+    row_group_size: int = 50_000,
+) -> str:
+    """
+    Save records as a single Parquet shard. `records` may be any iterable
+    (e.g. iter_checkpoint()); it is consumed one row group at a time.
+    """
     os.makedirs(output_dir, exist_ok=True)
     path = os.path.join(output_dir, f"{shard_name}.parquet")
 
-    rows = _serialise_lists(records)
-    table = pa.Table.from_pylist(rows, schema=SCHEMA)
-    pq.write_table(table, path, compression="snappy")
+    # Converted and written one row group at a time to bound peak memory
+    it = iter(records)
+    with RowGroupParquetWriter(
+        path, row_group_size, compression, compression_level,
+    ) as writer:
+        while chunk := list(itertools.islice(it, row_group_size)):
+            writer.write(chunk)
 
-    print(f"[Writer] Saved {len(records)} records → {path}")
+    print(f"[Writer] Saved {writer.rows} records → {path}")
     return path
 
 
-def save_jsonl(records: list[dict], output_dir: str, filename: str = "synth.jsonl") -> str:
+def save_jsonl(
+    records: Iterable[dict], output_dir: str, filename: str = "synth.jsonl",
+) -> str:
     """Save records as JSONL (good for streaming / inspection)."""
     os.makedirs(output_dir, exist_ok=True)
     path = os.path.join(output_dir, filename)
 
-    with open(path, "w", encoding="utf-8") as f:
+    n = 0
+    with open(path, "wb", buffering=JSONL_BUFFER) as f:
         for r in records:
-            f.write(json.dumps(r, ensure_ascii=False) + "\n")
+            f.write(_jsonl_line(r))
+            n += 1
 
-    print(f"[Writer] Saved {len(records)} records → {path}")
+    print(f"[Writer] Saved {n} records → {path}")
     return path
 
 
-def append_checkpoint(records: list[dict], output_dir: str) -> str:
-    """Append records to a running checkpoint JSONL."""
+def append_checkpoint(
+    records: list[dict], output_dir: str, fsync: bool = False,
+) -> str:
+    """
+    Append records to a running checkpoint JSONL.
+
+    The whole batch is encoded first and appended with a single write,
+    so a crash can tear at most the final line (load_checkpoint skips
+    it). fsync=True also flushes it to disk, e.g. at the end of a run.
+    """
     os.makedirs(output_dir, exist_ok=True)
-    path = os.path.join(output_dir, "_checkpoint.jsonl")
+    path = checkpoint_path(output_dir)
 
-    with open(path, "a", encoding="utf-8") as f:
-        for r in records:
-            f.write(json.dumps(r, ensure_ascii=False) + "\n")
+    payload = b"".join(map(_jsonl_line, records))
+    with open(path, "ab+", buffering=0) as f:
+        # Start on a fresh line if a previous write was torn
+        if f.tell():
+            f.seek(-1, os.SEEK_END)
+            if f.read(1) != b"\n":
+                payload = b"\n" + payload
+        f.write(payload)
+        if fsync:
+            os.fsync(f.fileno())
 
     return path
 
 
+def open_record_stream(path: str):
+    """Open a JSONL file for appending records one at a time."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    f = open(path, "ab+", buffering=JSONL_BUFFER)
+    # Start on a fresh line if a previous write was torn
+    if f.tell():
+        f.seek(-1, os.SEEK_END)
+        if f.read(1) != b"\n":
+            f.write(b"\n")
+    return f
+
+
+def write_record(stream, record: dict) -> None:
+    """Append one record to a stream from open_record_stream()."""
+    stream.write(_jsonl_line(record))
+
+
+def checkpoint_path(output_dir: str) -> str:
+    return os.path.join(output_dir, "_checkpoint.jsonl")
+
+
+def checkpoint_size(output_dir: str) -> int:
+    """Current checkpoint length in bytes (a start offset for iter_checkpoint)."""
+    try:
+        return os.path.getsize(checkpoint_path(output_dir))
+    except OSError:
+        return 0
+
+
+def iter_checkpoint(output_dir: str, start: int = 0) -> Iterator[dict]:
+    """
+    Stream checkpoint records from byte offset `start` (a value from
+    checkpoint_size()), one at a time, skipping torn lines.
+    """
+    path = checkpoint_path(output_dir)
+    if not os.path.exists(path):
+        return
+    torn = 0
+    with open(path, "rb", buffering=JSONL_BUFFER) as f:
+        f.seek(start)
+        for line in f:
+            if not line.strip():
+                continue
+            try:
+                yield _json_loads(line)
+            except ValueError:
+                torn += 1  # partial line left by a crash mid-write
+    if torn:
+        print(f"[Writer] Skipped {torn} truncated checkpoint line(s).")
+
+
 def load_checkpoint(output_dir: str) -> list[dict]:
     """Load existing checkpoint records (for resume)."""
-    path = os.path.join(output_dir, "_checkpoint.jsonl")
-    if not os.path.exists(path):
+    if not os.path.exists(checkpoint_path(output_dir)):
         return []
-    records = []
-    with open(path, "r", encoding="utf-8") as f:
-        for line in f:
-            if line.strip():
-                records.append(json.loads(line))
+    records = list(iter_checkpoint(output_dir))
     print(f"[Writer] Resumed {len(records)} records from checkpoint.")
     return records
 
 
-def print_stats(records: list[dict]) -> None:
+def print_stats(records: Iterable[dict]) -> None:
     """Print summary statistics for the generated dataset."""
-    df = pd.DataFrame(records)
+    # One pass over the records (any iterable); no DataFrame needed
+    by_skill, by_model, by_lang = Counter(), Counter(), Counter()
+    words_by_skill = defaultdict(int)
+    n = total_words = 0
+    scores = []
+    for r in records:
+        n += 1
+        w = r["words"]
+        total_words += w
+        by_skill[r["skill_id"]] += 1
+        words_by_skill[r["skill_id"]] += w
+        by_model[r["model"]] += 1
+        by_lang[r["language"]] += 1
+        if r.get("verified"):
+            scores.append(r["verification_score"])
+
     print("\n" + "=" * 60)
     print("DATASET STATISTICS")
     print("=" * 60)
-    print(f"Total records : {len(df)}")
-    print(f"Total words   : {df['words'].sum():,}")
-    print(f"Avg words/rec : {df['words'].mean():.0f}")
+    print(f"Total records : {n}")
+    print(f"Total words   : {total_words:,}")
+    print(f"Avg words/rec : {total_words / n:.0f}")
     print(f"\nBy skill:")
-    for sid, grp in df.groupby("skill_id"):
-        print(f"  {sid:20s}  {len(grp):5d} records  {grp['words'].sum():8,} words")
+    for sid in sorted(by_skill):
+        print(f"  {sid:20s}  {by_skill[sid]:5d} records  {words_by_skill[sid]:8,} words")
     print(f"\nBy model:")
-    for mid, grp in df.groupby("model"):
-        print(f"  {mid:20s}  {len(grp):5d} records")
+    for mid in sorted(by_model):
+        print(f"  {mid:20s}  {by_model[mid]:5d} records")
     print(f"\nBy language:")
-    for lang, grp in df.groupby("language"):
-        print(f"  {lang:5s}  {len(grp):5d} records")
-    if "verification_score" in df.columns and df["verified"].any():
-        verified = df[df["verified"]]
+    for lang in sorted(by_lang):
+        print(f"  {lang:5s}  {by_lang[lang]:5d} records")
+    if scores:
+        arr = np.asarray(scores, dtype=np.float64)
         print(f"\nVerification scores:")
-        print(f"  Mean  : {verified['verification_score'].mean():.1f}")
-        print(f"  Median: {verified['verification_score'].median():.1f}")
-        print(f"  <5    : {(verified['verification_score'] < 5).sum()} records")
+        print(f"  Mean  : {arr.mean():.1f}")
+        print(f"  Median: {np.median(arr):.1f}")
+        print(f"  <5    : {int((arr < 5).sum())} records")
     print("=" * 60)
 
 
@@ -142,7 +358,7 @@ def push_to_hub(
     """Upload the dataset to HuggingFace Hub."""
     from datasets import Dataset
 
-    table = pq.read_table(parquet_path)
-    ds = Dataset(table)
+    # Memory-mapped Arrow cache instead of reading the shard into RAM
+    ds = Dataset.from_parquet(parquet_path)
     ds.push_to_hub(repo_id, token=token)
     print(f"[Writer] Pushed to https://huggingface.co/datasets/{repo_id}")
@@ -10,108 +10,256 @@ Ollama handles model loading/unloading automatically.
 Just call generate() — it pulls the model if needed.
 """
 
+import copy
+import functools
 import gc
+import hashlib
+import http.client
+import importlib.util
+import inspect
 import json
 import os
+import queue
+import re
 import sys
+import threading
 import time
+import traceback
+import urllib.parse
 import urllib.request
 import urllib.error
 from pathlib import Path
 
-# ── GGUF backend (optional) ────────────────────────────────
+# ── Optional backends ──────────────────────────────────────
+# Only probed here; llama_cpp / torch / transformers are imported when a
+# GGUF or HF model is actually loaded, so the Ollama path never pays for
+# them (torch alone is seconds of startup and hundreds of MB).
+
+_HAS_LLAMA_CPP = importlib.util.find_spec("llama_cpp") is not None
+_HAS_HF = (
+    importlib.util.find_spec("torch") is not None
+    and importlib.util.find_spec("transformers") is not None
+)
 
-_HAS_LLAMA_CPP = False
 try:
-    from llama_cpp import Llama
-    _HAS_LLAMA_CPP = True
+    import orjson
 except ImportError:
-    pass
+    orjson = None
 
-# ── HF backend (optional) ──────────────────────────────────
+# Request bodies go straight to bytes and responses are parsed from
+# bytes, with no intermediate str; json is the fallback.
+if orjson is not None:
+    _json_body = orjson.dumps
+    _json_loads = orjson.loads
+else:
+    def _json_body(payload: dict) -> bytes:
+        return json.dumps(payload, ensure_ascii=False).encode("utf-8")
 
-_HAS_HF = False
-try:
-    import torch
-    from transformers import (
-        AutoModelForCausalLM,
-        AutoTokenizer,
-        BitsAndBytesConfig,
-        GenerationConfig,
-    )
-    _HAS_HF = True
-except ImportError:
-    pass
+    _json_loads = json.loads
 
 
 # ── Ollama helpers ──────────────────────────────────────────
 
 OLLAMA_BASE = os.environ.get("OLLAMA_HOST", "http://localhost:11434")
+# How long the server keeps a model in memory after our last request.
+# Ollama's own default (5m) can lapse during a long verify pass or
+# checkpoint, forcing a cold reload for the next batch.
+OLLAMA_KEEP_ALIVE = os.environ.get("OLLAMA_KEEP_ALIVE", "30m")
+
+
+_OLLAMA_URL = urllib.parse.urlsplit(
+    OLLAMA_BASE if "://" in OLLAMA_BASE else f"http://{OLLAMA_BASE}"
+)
+# Idle keep-alive connections shared by all threads. Worker threads are
+# started per batch, so a per-thread connection would die with its
+# thread; pooled ones carry over to the next batch, secondaries and the
+# verifier, instead of a fresh TCP connect + handshake per request.
+_ollama_idle: list[http.client.HTTPConnection] = []
+_ollama_idle_lock = threading.Lock()
+OLLAMA_POOL_MAX = 32
+# Errors meaning the server dropped an idle keep-alive connection; the
+# request never reached it, so it is safe to reconnect and resend once.
+_STALE_CONN_ERRORS = (
+    http.client.RemoteDisconnected, http.client.CannotSendRequest,
+    ConnectionResetError, BrokenPipeError,
+)
+
+
+def _ollama_conn(timeout: float, fresh: bool = False) -> http.client.HTTPConnection:
+    """Check out an idle pooled connection (unless `fresh`), or open a new one."""
+    conn = None
+    if not fresh:
+        with _ollama_idle_lock:
+            conn = _ollama_idle.pop() if _ollama_idle else None
+    if conn is None:
+        cls = (http.client.HTTPSConnection
+               if _OLLAMA_URL.scheme == "https" else http.client.HTTPConnection)
+        conn = cls(_OLLAMA_URL.hostname, _OLLAMA_URL.port, timeout=timeout)
+    conn.timeout = timeout
+    if conn.sock is not None:
+        conn.sock.settimeout(timeout)
+    return conn
+
+
+def _ollama_release(conn: http.client.HTTPConnection) -> None:
+    """Return a connection whose response was fully read to the pool."""
+    with _ollama_idle_lock:
+        if len(_ollama_idle) < OLLAMA_POOL_MAX:
+            _ollama_idle.append(conn)
+            return
+    conn.close()
+
+
+def _ollama_close_all() -> None:
+    """Close every idle pooled Ollama connection."""
+    with _ollama_idle_lock:
+        idle = _ollama_idle[:]
+        _ollama_idle.clear()
+    for conn in idle:
+        conn.close()
+
+
+def _ollama_send(method: str, endpoint: str, payload: dict | None,
+                 timeout: float):
+    """Send one request over a pooled connection; return (conn, response)."""
+    path = _OLLAMA_URL.path.rstrip("/") + endpoint
+    headers = {"Connection": "keep-alive"}
+    body = None
+    if payload is not None:
+        body = _json_body(payload)
+        headers["Content-Type"] = "application/json"
+
+    for attempt in range(2):
+        # The retry uses a new connection: after a server restart every
+        # idle pooled one is stale too
+        conn = _ollama_conn(timeout, fresh=bool(attempt))
+        try:
+            conn.request(method, path, body=body, headers=headers)
+            return conn, conn.getresponse()
+        except _STALE_CONN_ERRORS:
+            conn.close()
+            if attempt:
+                raise
+            _ollama_close_all()
+        except Exception:
+            conn.close()
+            raise
+
+
+def _ollama_finish(conn, resp, endpoint: str) -> None:
+    """Pool a fully read connection; raise HTTPError on an error status."""
+    if resp.will_close:
+        conn.close()
+    else:
+        _ollama_release(conn)
+    if resp.status >= 400:
+        raise urllib.error.HTTPError(
+            f"{OLLAMA_BASE}{endpoint}", resp.status, resp.reason,
+            resp.headers, None,
+        )
+
+
+def _ollama_http(method: str, endpoint: str, payload: dict | None = None,
+                 timeout: float = 600) -> bytes:
+    """Send one request over a pooled connection; return the body."""
+    conn, resp = _ollama_send(method, endpoint, payload, timeout)
+    try:
+        data = resp.read()
+    except Exception:
+        conn.close()
+        raise
+    _ollama_finish(conn, resp, endpoint)
+    return data
+
+
+def _ollama_stream(endpoint: str, payload: dict, timeout: float = 600):
+    """
+    POST with "stream": true and yield each NDJSON chunk as it arrives.
+    Abandoning the generator early closes the connection instead of
+    returning it to the pool.
+    """
+    payload["stream"] = True
+    conn, resp = _ollama_send("POST", endpoint, payload, timeout)
+    if resp.status >= 400:
+        resp.read()
+        _ollama_finish(conn, resp, endpoint)
+    done = False
+    try:
+        for line in resp:
+            if line.strip():
+                yield _json_loads(line)
+        done = True
+    finally:
+        if done:
+            _ollama_finish(conn, resp, endpoint)
+        else:
+            conn.close()
 
 
 def _ollama_request(endpoint: str, payload: dict,
                     timeout: float = 600) -> dict:
     """Make a JSON POST request to Ollama API."""
-    url = f"{OLLAMA_BASE}{endpoint}"
-    data = json.dumps(payload).encode("utf-8")
-    req = urllib.request.Request(
-        url,
-        data=data,
-        headers={"Content-Type": "application/json"},
-        method="POST",
-    )
-    with urllib.request.urlopen(req, timeout=timeout) as resp:
-        return json.loads(resp.read().decode("utf-8"))
+    return _json_loads(_ollama_http("POST", endpoint, payload, timeout))
 
 
 def _ollama_request_stream(endpoint: str, payload: dict,
                            timeout: float = 600) -> str:
     """Make a streaming POST request, collect full response text."""
-    url = f"{OLLAMA_BASE}{endpoint}"
     payload["stream"] = False  # we want single JSON response
-    data = json.dumps(payload).encode("utf-8")
-    req = urllib.request.Request(
-        url,
-        data=data,
-        headers={"Content-Type": "application/json"},
-        method="POST",
-    )
-    with urllib.request.urlopen(req, timeout=timeout) as resp:
-        result = json.loads(resp.read().decode("utf-8"))
-    return result
+    return _json_loads(_ollama_http("POST", endpoint, payload, timeout))
+
+
+# Answers from /api/tags, kept briefly so repeated checks (every model
+# load, secondaries, validation) don't each round-trip to the server.
+_OLLAMA_CACHE_TTL = 30.0
+_ollama_cache: dict[tuple, tuple[bool, float]] = {}
 
 
+def _ttl_cached(fn):
+    @functools.wraps(fn)
+    def wrapper(*args):
+        key = (fn.__name__, *args)
+        hit = _ollama_cache.get(key)
+        now = time.monotonic()
+        if hit is not None and hit[1] > now:
+            return hit[0]
+        value = fn(*args)
+        _ollama_cache[key] = (value, now + _OLLAMA_CACHE_TTL)
+        return value
+    return wrapper
+
+
+@_ttl_cached
 def _ollama_is_running() -> bool:
     """Check if Ollama server is reachable."""
     try:
-        url = f"{OLLAMA_BASE}/api/tags"
-        req = urllib.request.Request(url, method="GET")
-        with urllib.request.urlopen(req, timeout=5) as resp:
-            return resp.status == 200
+        _ollama_http("GET", "/api/tags", timeout=5)
+        return True
     except Exception:
         return False
 
 
+@_ttl_cached
 def _ollama_has_model(model_name: str) -> bool:
     """Check if a model is already pulled in Ollama."""
     try:
-        url = f"{OLLAMA_BASE}/api/tags"
-        req = urllib.request.Request(url, method="GET")
-        with urllib.request.urlopen(req, timeout=10) as resp:
-            data = json.loads(resp.read().decode("utf-8"))
-            models = [m["name"] for m in data.get("models", [])]
-            # Ollama names can have :latest suffix
-            for m in models:
-                base = m.split(":")[0]
-                if model_name == m or model_name == base:
-                    return True
-                if model_name.split(":")[0] == base:
-                    return True
-            return False
+        data = _json_loads(_ollama_http("GET", "/api/tags", timeout=10))
+        # Ollama names can have :latest suffix — match full or base name
+        names = set()
+        for m in data.get("models", []):
+            names.add(m["name"])
+            names.add(m["name"].split(":")[0])
+        return model_name in names or model_name.split(":")[0] in names
     except Exception:
         return False
 
 
+PULL_PRINT_HZ = 20
+RE_PULL_FIELD = re.compile(
+    rb'"(status|total|completed)"\s*:\s*("(?:[^"\\]|\\.)*"|\d+)'
+)
+
+
 def _ollama_pull(model_name: str) -> None:
     """Pull a model into Ollama (downloads if needed)."""
     print(f"[ModelManager] Pulling {model_name} in Ollama "
@@ -119,41 +267,120 @@ def _ollama_pull(model_name: str) -> None:
     # Use stream=False for simpler handling
     url = f"{OLLAMA_BASE}/api/pull"
     payload = {"name": model_name, "stream": True}
-    data = json.dumps(payload).encode("utf-8")
+    data = _json_body(payload)
     req = urllib.request.Request(
         url, data=data,
         headers={"Content-Type": "application/json"},
         method="POST",
     )
+    last_status, last_print = None, 0.0
     with urllib.request.urlopen(req, timeout=3600) as resp:
-        # Stream progress
+        # Stream progress: pick the three fields straight off the bytes
+        # and redraw at most PULL_PRINT_HZ times a second.
         for line in resp:
-            try:
-                chunk = json.loads(line.decode("utf-8"))
-                status = chunk.get("status", "")
-                if "pulling" in status:
-                    total = chunk.get("total", 0)
-                    completed = chunk.get("completed", 0)
-                    if total > 0:
-                        pct = completed / total * 100
-                        print(f"\r  [{status}] {pct:.0f}%    ",
-                              end="", flush=True)
-                elif status:
-                    print(f"\r  [{status}]              ",
+            fields = dict(RE_PULL_FIELD.findall(line))
+            status = fields.get(b"status", b'""')[1:-1].decode(
+                "utf-8", "replace"
+            )
+            now = time.monotonic()
+            if (status == last_status
+                    and now - last_print < 1 / PULL_PRINT_HZ):
+                continue
+            if "pulling" in status:
+                total = int(fields.get(b"total", 0))
+                completed = int(fields.get(b"completed", 0))
+                if total > 0:
+                    pct = completed / total * 100
+                    print(f"\r  [{status}] {pct:.0f}%    ",
                           end="", flush=True)
-            except Exception:
-                pass
+            elif status:
+                print(f"\r  [{status}]              ",
+                      end="", flush=True)
+            last_status, last_print = status, now
     print()  # newline after progress
+    _ollama_cache.clear()  # the tag list just changed
+
+
+def _restore_stop(text: str, stop: list[str] | None, stopped: bool) -> str:
+    """
+    Re-append the closing-tag stop sequence that Ollama / llama.cpp strip
+    off. Both report "stop" for a natural EOS too, so the tag is only
+    restored when the text ends inside its unclosed opening tag (e.g. an
+    open <answer>) — never fabricated onto output that didn't reach it.
+    """
+    if not (stopped and stop):
+        return text
+    for seq in stop:
+        if seq.startswith("</") and text.rfind("<" + seq[2:]) > text.rfind(seq):
+            return text + seq
+    return text
+
+
+# ── HF quantization ────────────────────────────────────────
+
+# Default bitsandbytes quant per gpu_tier for HF models that don't set
+# `quant`: decode is bound by weight reads, so smaller weights are both
+# what fits the tier and faster. Unlisted tiers load fp16.
+TIER_QUANT = {"consumer_8gb": "4bit", "mid_16gb": "8bit"}
+
+
+def hf_quant(cfg: dict) -> str:
+    """The quant an HF model cfg loads with: explicit, else by gpu_tier."""
+    return cfg.get("quant") or TIER_QUANT.get(cfg.get("gpu_tier"), "none")
 
 
 # ── GGUF download helper ───────────────────────────────────
 
 CACHE_DIR = Path.home() / ".cache" / "cot-synth" / "gguf"
+# TorchInductor's compiled-graph cache, kept across runs so HF models
+# with `compile` only pay the full compile once. Inductor reads these at
+# import, so they are set here, before anything imports torch.
+INDUCTOR_CACHE_DIR = Path(os.environ.setdefault(
+    "TORCHINDUCTOR_CACHE_DIR", str(CACHE_DIR.parent / "inductor")
+))
+os.environ.setdefault("TORCHINDUCTOR_FX_GRAPH_CACHE", "1")
+os.environ.setdefault("TORCHINDUCTOR_AUTOGRAD_CACHE", "1")
+
+
+# Parallel multi-connection downloads when the Rust backends are present
+# (huggingface_hub reads these at import, so set them before it loads).
+# HF_HUB_ENABLE_HF_TRANSFER=1 errors without hf_transfer, hence the probe.
+if importlib.util.find_spec("hf_transfer") is not None:
+    os.environ.setdefault("HF_HUB_ENABLE_HF_TRANSFER", "1")
+os.environ.setdefault("HF_XET_HIGH_PERFORMANCE", "1")
+
+# Split GGUFs: "<name>-00001-of-00003.gguf"; llama.cpp is given shard 1
+RE_GGUF_SHARD = re.compile(r"-(\d{5})-of-(\d{5})\.gguf$", re.IGNORECASE)
 
 
 def _download_gguf(repo: str, filename: str) -> str:
-    """Download a GGUF file from HuggingFace Hub if not cached."""
-    local_path = CACHE_DIR / repo.replace("/", "--") / filename
+    """
+    Download a GGUF file from HuggingFace Hub if not cached. For a split
+    GGUF, all shards are fetched concurrently and the first is returned.
+    """
+    local_dir = CACHE_DIR / repo.replace("/", "--")
+    shard = RE_GGUF_SHARD.search(filename)
+    if shard:
+        stem = filename[:shard.start()]
+        total = int(shard.group(2))
+        names = [f"{stem}-{i:05d}-of-{total:05d}.gguf"
+                 for i in range(1, total + 1)]
+        first = local_dir / names[0]
+        if all((local_dir / n).exists() for n in names):
+            return str(first)
+
+        print(f"[ModelManager] Downloading {repo}/{stem} "
+              f"({total} shards) ...")
+        from huggingface_hub import snapshot_download
+        snapshot_download(
+            repo_id=repo,
+            allow_patterns=names,
+            local_dir=str(local_dir),
+            max_workers=8,
+        )
+        return str(first)
+
+    local_path = local_dir / filename
     if local_path.exists():
         return str(local_path)
 
@@ -170,6 +397,47 @@ def _download_gguf(repo: str, filename: str) -> str:
     return downloaded
 
 
+# Quant tags tried in order when a GGUF model names no exact file.
+# Q4_K_M (~4.8 bits/weight) is the usual quality/size knee: ~4× smaller
+# than fp16, and llama.cpp's k-quant kernels make it faster than Q8_0 in
+# memory-bound decode. Override per model with `gguf_quant`.
+GGUF_QUANT_PREFERENCE = ("Q4_K_M", "Q5_K_M", "Q4_K_S", "Q8_0")
+
+# `kv_quant` values → ggml type ids for llama-cpp-python's type_k/type_v
+GGML_KV_TYPES = {"f16": 1, "q4_0": 2, "q8_0": 8}
+
+
+def _pick_gguf(files: list[str], preference) -> str | None:
+    """First .gguf file whose name carries the most preferred quant tag."""
+    ggufs = [f for f in files if f.lower().endswith(".gguf")]
+    for quant in preference:
+        tag = quant.lower()
+        for f in sorted(ggufs):
+            if tag in Path(f).name.lower():
+                return f
+    return None
+
+
+def _download_gguf_best(repo: str, preference) -> str:
+    """Download the repo's GGUF file that best matches `preference`."""
+    try:
+        from huggingface_hub import list_repo_files
+        files = list_repo_files(repo)
+    except Exception as e:
+        # Offline: settle for the best already-downloaded file
+        local_dir = CACHE_DIR / repo.replace("/", "--")
+        files = [str(p.relative_to(local_dir))
+                 for p in local_dir.rglob("*.gguf")]
+        print(f"[ModelManager] Can't list {repo} ({e}); "
+              f"using cached files.")
+    fname = _pick_gguf(files, preference)
+    if fname is None:
+        raise FileNotFoundError(
+            f"No GGUF file in {repo} matches {list(preference)}"
+        )
+    return _download_gguf(repo, fname)
+
+
 # ================================================================
 # ModelManager
 # ================================================================
@@ -177,25 +445,86 @@ def _download_gguf(repo: str, filename: str) -> str:
 class ModelManager:
     """Loads one model at a time. Supports Ollama, GGUF, and HF."""
 
-    def __init__(self):
+    def __init__(self, max_parallel: int | None = None,
+                 batch_size: int = 1):
+        # Concurrent Ollama requests per batch; match the server's
+        # OLLAMA_NUM_PARALLEL so none of them just wait in its queue.
+        self.max_parallel = max(1, max_parallel or int(
+            os.environ.get("OLLAMA_NUM_PARALLEL", 4)
+        ))
+        # HF only: prompts padded into one model.generate() call
+        self.batch_size = max(1, batch_size or 1)
         self._model = None       # for GGUF/HF
         self._tokenizer = None   # for HF only
         self._current_id: str | None = None
         self._backend: str | None = None
         self._ollama_checked = False
         self._ollama_available = False
+        self._current_cfg: dict | None = None
+        # Extra models kept resident next to the current one (e.g. the
+        # verifier), keyed by model id. Each is its own ModelManager.
+        self._secondary: dict[str, "ModelManager"] = {}
+        # HF only: system message → (rendered system turn, its token ids),
+        # so the shared prefix is tokenised once per cot_style/language.
+        self._prefix_ids: dict[str, tuple[str | None, list[int] | None]] = {}
+        # HF only: system message → KV cache of its prefilled system turn
+        # (None if the model can't take a prefilled cache)
+        self._prefix_kv: dict[str, object] = {}
+        # HF only: sampling settings → GenerationConfig, and rendered chat
+        # prompts by message digest (retries re-send the same messages)
+        self._gen_cfgs: dict[tuple, object] = {}
+        self._prompts: dict[bytes, str] = {}
+        self._added_tokens: tuple[str, ...] = ()
+        # Speculative decoding: HF draft model / its tokens per step
+        self._draft = None
+        self._draft_tokens = 5
+        # Engine-reported timing of the last request on each thread
+        self._stats = threading.local()
 
     # ── Public API ──────────────────────────────────────────
 
-    def load(self, model_cfg: dict) -> None:
-        """Load a model from config. Unloads previous if different."""
+    def is_loaded(self, model_cfg: dict) -> bool:
+        """
+        True if model_cfg is the current model or a resident secondary
+        with the same weights/settings. The id alone is not enough: e.g.
+        a verifier variant keeps its pool entry's id but loads a
+        different quantization.
+        """
         mid = model_cfg["id"]
         if mid == self._current_id:
+            return self._load_key(model_cfg) == self._load_key(self._current_cfg)
+        sub = self._secondary.get(mid)
+        return sub is not None and sub.is_loaded(model_cfg)
+
+    def load(self, model_cfg: dict) -> None:
+        """
+        Load a model from config. Unloads previous if different; loading
+        the model that is already current is a no-op.
+        """
+        mid = model_cfg["id"]
+        if (mid == self._current_id
+                and self._load_key(model_cfg) == self._load_key(self._current_cfg)):
+            return
+        if (self._current_cfg is not None
+                and self._load_key(model_cfg)
+                == self._load_key(self._current_cfg)):
+            # Another entry for the same loaded weights/settings (e.g. it
+            # only differs in metadata) — just relabel, no reload
+            self._current_id = mid
+            self._current_cfg = model_cfg
             return
 
         self._unload()
         backend = model_cfg.get("backend", "ollama")
 
+        # A resident secondary that becomes the primary is loaded afresh;
+        # GPU-resident secondaries were only sized against the old primary.
+        self._drop_secondary(mid)
+        if backend != "ollama":
+            for sid, sub in list(self._secondary.items()):
+                if sub._backend != "ollama":
+                    self._drop_secondary(sid)
+
         if backend == "ollama":
             self._load_ollama(model_cfg)
         elif backend == "gguf":
@@ -207,6 +536,63 @@ class ModelManager:
 
         self._current_id = mid
         self._backend = backend
+        self._current_cfg = model_cfg
+
+    # Ollama models already warmed up by any manager in this process
+    _warmed: set[str] = set()
+
+    # Config keys that change what a backend actually loads
+    _LOAD_KEYS = {
+        "ollama": ("ollama_model",),
+        "gguf": ("gguf_repo", "gguf_file", "gguf_quant", "ctx", "gpu_layers",
+                 "n_batch", "n_ubatch", "kv_quant", "draft_model",
+                 "draft_tokens"),
+        "hf": ("hf_repo", "compile", "attn_impl", "draft_model",
+               "draft_tokens"),
+    }
+
+    @classmethod
+    def _load_key(cls, cfg: dict) -> tuple:
+        backend = cfg.get("backend", "ollama")
+        key = tuple(repr(cfg.get(k)) for k in cls._LOAD_KEYS.get(backend, ()))
+        if backend == "hf":
+            key += (hf_quant(cfg),)
+        return (backend, *key)
+
+    def load_secondary(self, model_cfg: dict) -> bool:
+        """
+        Keep model_cfg resident alongside the current model if it fits.
+
+        Ollama models always qualify (the server manages residency; raise
+        OLLAMA_MAX_LOADED_MODELS to keep both in VRAM). GGUF/HF models need
+        their vram_est plus headroom to fit in free GPU memory. Returns
+        True when the model is resident; otherwise generate_many_on()
+        falls back to swapping the primary.
+        """
+        if self.is_loaded(model_cfg):
+            return True
+        if not self._fits_alongside(model_cfg):
+            return False
+
+        # A secondary under this id with other settings is replaced
+        self._drop_secondary(model_cfg["id"])
+        sub = type(self)(self.max_parallel, self.batch_size)
+        sub.load(model_cfg)
+        self._secondary[model_cfg["id"]] = sub
+        return True
+
+    def generate_many_on(
+        self,
+        model_cfg: dict,
+        messages_list: list[list[dict]],
+        params_list: list[dict],
+    ) -> list[str]:
+        """generate_many() on model_cfg without evicting a resident model."""
+        sub = self._secondary.get(model_cfg["id"])
+        if sub is not None and sub.is_loaded(model_cfg):
+            return sub.generate_many(messages_list, params_list)
+        self.load(model_cfg)
+        return self.generate_many(messages_list, params_list)
 
     def generate(
         self,
@@ -216,26 +602,138 @@ class ModelManager:
         top_p: float = 0.9,
         top_k: int = 50,
         repetition_penalty: float = 1.1,
+        stop: list[str] | None = None,
     ) -> str:
-        """Generate from chat-style messages. Routes to correct backend."""
+        """
+        Generate from chat-style messages. Routes to correct backend.
+
+        Generation halts at any `stop` sequence; the sequence that ended
+        it is kept at the end of the returned text (so a closing tag used
+        as a stop still parses).
+        """
         if self._backend == "ollama":
             return self._generate_ollama(
                 messages, max_new_tokens, temperature, top_p, top_k,
-                repetition_penalty,
+                repetition_penalty, stop,
             )
         elif self._backend == "gguf":
             assert self._model is not None, "No model loaded."
             return self._generate_gguf(
                 messages, max_new_tokens, temperature, top_p, top_k,
-                repetition_penalty,
+                repetition_penalty, stop,
             )
         else:
             assert self._model is not None, "No model loaded."
             return self._generate_hf(
                 messages, max_new_tokens, temperature, top_p, top_k,
-                repetition_penalty,
+                repetition_penalty, stop,
             )
 
+    def iter_generate_many(
+        self,
+        messages_list: list[list[dict]],
+        params_list: list[dict],
+    ):
+        """
+        Yield (index, text) for a batch of chat prompts as each finishes.
+
+        Generation runs on worker threads (max_parallel of them for Ollama,
+        one otherwise), so whatever the caller does with one result
+        (parsing, record building) overlaps the next request instead of
+        leaving the backend idle. HF models with batch_size > 1 take
+        requests in padded batches of that size. params_list[i] holds
+        the generate() kwargs for messages_list[i]; a request that raises
+        yields "" so the caller can re-batch just the failures.
+        """
+        for i, text, _ in self.iter_generate_many_timed(
+            messages_list, params_list
+        ):
+            yield i, text
+
+    def iter_generate_many_timed(
+        self,
+        messages_list: list[list[dict]],
+        params_list: list[dict],
+    ):
+        """
+        Like iter_generate_many(), but yield (index, text, stats):
+        stats["gen_s"] is that request's own generation time (reported by
+        Ollama when available, else timed around the call),
+        stats["ttft_s"] the time to first token and stats["tokens"] the
+        number of tokens generated (each None if unknown).
+        """
+        results: queue.Queue = queue.Queue()
+        jobs: queue.SimpleQueue = queue.SimpleQueue()
+        if self._backend == "hf" and self.batch_size > 1:
+            groups = self._hf_batches(params_list)
+        else:
+            groups = [[i] for i in range(len(messages_list))]
+        for group in groups:
+            jobs.put(group)
+
+        def _worker():
+            while True:
+                try:
+                    group = jobs.get_nowait()
+                except queue.Empty:
+                    break
+                self._stats.value = None
+                t0 = time.perf_counter()
+                try:
+                    if len(group) == 1:
+                        texts = [self.generate(
+                            messages_list[group[0]], **params_list[group[0]]
+                        )]
+                    else:
+                        texts = self._generate_hf_batch(
+                            [messages_list[i] for i in group],
+                            **self._batch_params(
+                                [params_list[i] for i in group]
+                            ),
+                        )
+                except Exception:
+                    traceback.print_exc()
+                    texts = [""] * len(group)
+                stats = {
+                    "gen_s": time.perf_counter() - t0,
+                    "ttft_s": None, "tokens": None,
+                }
+                stats.update(self._stats.value or {})
+                row_tokens = stats.pop("row_tokens", None)
+                for k, (i, text) in enumerate(zip(group, texts)):
+                    if row_tokens is not None:
+                        results.put((i, text, {**stats, "tokens": row_tokens[k]}))
+                    else:
+                        results.put((i, text, stats))
+            results.put(None)
+
+        # Ollama batches concurrent requests server-side, so keep several
+        # in flight; in-process GGUF/HF models take one request at a time.
+        n_workers = min(
+            self.max_parallel if self._backend == "ollama" else 1,
+            len(groups),
+        )
+        for _ in range(n_workers):
+            threading.Thread(target=_worker, daemon=True).start()
+        finished = 0
+        while finished < n_workers:
+            item = results.get()
+            if item is None:
+                finished += 1
+            else:
+                yield item
+
+    def generate_many(
+        self,
+        messages_list: list[list[dict]],
+        params_list: list[dict],
+    ) -> list[str]:
+        """Generate for a whole batch of chat prompts; results in input order."""
+        outputs = [""] * len(messages_list)
+        for i, text in self.iter_generate_many(messages_list, params_list):
+            outputs[i] = text
+        return outputs
+
     def current_model_id(self) -> str | None:
         return self._current_id
 
@@ -265,29 +763,40 @@ class ModelManager:
         if not _ollama_has_model(model_name):
             _ollama_pull(model_name)
 
-        # Warm up — load model into VRAM by sending a tiny request
-        print(f"[ModelManager] Warming up {model_name} ...")
-        try:
-            _ollama_request_stream("/api/chat", {
-                "model": model_name,
-                "messages": [{"role": "user", "content": "hi"}],
-                "options": {"num_predict": 1},
-            }, timeout=120)
-        except Exception as e:
-            print(f"[ModelManager] Warmup note: {e}")
+        # Warm up — load model into VRAM by sending a tiny request.
+        # Only once per Ollama model per process: after that OLLAMA_KEEP_ALIVE
+        # keeps it resident, and if it was evicted the first real request
+        # reloads it anyway.
+        # Batches keep max_parallel requests in flight; the server only
+        # runs them concurrently if started with OLLAMA_NUM_PARALLEL at
+        # least that high (and OLLAMA_MAX_LOADED_MODELS=1 leaves all of
+        # VRAM to this model's parallel KV caches).
+        if model_name not in ModelManager._warmed:
+            print(f"[ModelManager] Warming up {model_name} "
+                  f"(up to {self.max_parallel} concurrent requests) ...")
+            try:
+                _ollama_request_stream("/api/chat", {
+                    "model": model_name,
+                    "messages": [{"role": "user", "content": "hi"}],
+                    "options": {"num_predict": 1},
+                    "keep_alive": OLLAMA_KEEP_ALIVE,
+                }, timeout=120)
+                ModelManager._warmed.add(model_name)
+            except Exception as e:
+                print(f"[ModelManager] Warmup note: {e}")
 
         self._model = model_name  # just store the name
         print(f"[ModelManager] {cfg['id']} ready (Ollama).")
 
     def _generate_ollama(
         self, messages, max_new_tokens, temperature, top_p, top_k,
-        repetition_penalty,
+        repetition_penalty, stop=None,
     ) -> str:
         model_name = self._model  # stored as string for Ollama
         payload = {
             "model": model_name,
             "messages": messages,
-            "stream": False,
+            "keep_alive": OLLAMA_KEEP_ALIVE,
             "options": {
                 "num_predict": max_new_tokens,
                 "temperature": max(temperature, 0.01),
@@ -296,10 +805,32 @@ class ModelManager:
                 "repeat_penalty": repetition_penalty,
             },
         }
-
-        result = _ollama_request_stream("/api/chat", payload, timeout=600)
-        content = result.get("message", {}).get("content", "")
-        return content.strip()
+        if stop:
+            payload["options"]["stop"] = stop
+
+        # Streamed, so the first token is seen (and timed) as soon as the
+        # server emits it rather than after the whole completion
+        parts, ttft, result = [], None, {}
+        t0 = time.perf_counter()
+        for chunk in _ollama_stream("/api/chat", payload, timeout=600):
+            if "error" in chunk:
+                raise RuntimeError(f"Ollama error: {chunk['error']}")
+            piece = chunk.get("message", {}).get("content")
+            if piece:
+                if ttft is None:
+                    ttft = time.perf_counter() - t0
+                parts.append(piece)
+            if chunk.get("done"):
+                result = chunk
+        if "total_duration" in result:
+            # Server-side durations are in nanoseconds
+            self._stats.value = {
+                "gen_s": result["total_duration"] / 1e9,
+                "ttft_s": ttft,
+                "tokens": result.get("eval_count"),
+            }
+        stopped = result.get("done_reason") == "stop"
+        return _restore_stop("".join(parts).strip(), stop, stopped)
 
     # ── GGUF backend ────────────────────────────────────────
 
@@ -311,10 +842,18 @@ class ModelManager:
                 "  CMAKE_ARGS=\"-DGGML_CUDA=ON\" "
                 "pip install llama-cpp-python"
             )
+        from llama_cpp import Llama
 
         repo = cfg["gguf_repo"]
-        fname = cfg["gguf_file"]
-        model_path = _download_gguf(repo, fname)
+        quant = cfg.get("gguf_quant")
+        if cfg.get("gguf_file") and not quant:
+            model_path = _download_gguf(repo, cfg["gguf_file"])
+        else:
+            if isinstance(quant, str):
+                quant = [quant]
+            model_path = _download_gguf_best(
+                repo, quant or GGUF_QUANT_PREFERENCE
+            )
 
         n_ctx = min(cfg.get("ctx", 32768), 32768)
         n_gpu_layers = cfg.get("gpu_layers", -1)
@@ -322,19 +861,45 @@ class ModelManager:
         print(f"[ModelManager] Loading GGUF: {cfg['id']} "
               f"(n_ctx={n_ctx}, gpu_layers={n_gpu_layers}) ...")
 
+        kwargs = {
+            "n_ctx": n_ctx,
+            "n_gpu_layers": n_gpu_layers,
+            "n_threads": os.cpu_count() or 4,
+            "verbose": False,
+            "flash_attn": True,
+            # Prompt tokens per prefill dispatch (logical / physical)
+            "n_batch": cfg.get("n_batch", 512),
+            "n_ubatch": cfg.get("n_ubatch", 512),
+            "offload_kqv": True,
+            "logits_all": False,
+        }
+        if cfg.get("draft_model") == "prompt_lookup":
+            # llama-cpp-python's built-in drafter: proposes continuations
+            # copied from the prompt, no second model needed
+            from llama_cpp.llama_speculative import LlamaPromptLookupDecoding
+            kwargs["draft_model"] = LlamaPromptLookupDecoding(
+                num_pred_tokens=cfg.get("draft_tokens", 10)
+            )
+        kv_quant = cfg.get("kv_quant")
+        if kv_quant:
+            # Quantized KV halves its bandwidth at long contexts (the V
+            # cache needs flash_attn, which is on)
+            kwargs["type_k"] = kwargs["type_v"] = GGML_KV_TYPES[kv_quant]
+        # Older llama-cpp-python builds lack some of these; drop them
+        # rather than fail the load
+        known = inspect.signature(Llama.__init__).parameters
+        unsupported = [k for k in kwargs if k not in known]
+        if unsupported:
+            print(f"[ModelManager] llama-cpp-python ignores: {unsupported}")
         self._model = Llama(
             model_path=model_path,
-            n_ctx=n_ctx,
-            n_gpu_layers=n_gpu_layers,
-            n_threads=os.cpu_count() or 4,
-            verbose=False,
-            flash_attn=True,
+            **{k: v for k, v in kwargs.items() if k in known},
         )
         print(f"[ModelManager] {cfg['id']} ready (GGUF).")
 
     def _generate_gguf(
         self, messages, max_new_tokens, temperature, top_p, top_k,
-        repetition_penalty,
+        repetition_penalty, stop=None,
     ) -> str:
         response = self._model.create_chat_completion(
             messages=messages,
@@ -343,85 +908,347 @@ class ModelManager:
             top_p=top_p,
             top_k=top_k,
             repeat_penalty=repetition_penalty,
+            stop=stop or None,
         )
-        content = response["choices"][0]["message"]["content"]
-        return content.strip() if content else ""
+        usage = response.get("usage") or {}
+        self._stats.value = {"tokens": usage.get("completion_tokens")}
+        choice = response["choices"][0]
+        content = choice["message"]["content"]
+        stopped = choice.get("finish_reason") == "stop"
+        return _restore_stop(content.strip() if content else "", stop, stopped)
 
     # ── HF backend ──────────────────────────────────────────
 
     def _load_hf(self, cfg: dict) -> None:
         if not _HAS_HF:
             raise ImportError("transformers / torch not installed.")
+        from transformers import AutoModelForCausalLM, AutoTokenizer
 
         repo = cfg["hf_repo"]
-        quant = cfg.get("quant", "none")
 
-        print(f"[ModelManager] Loading HF: {cfg['id']} ({repo}) ...")
+        print(f"[ModelManager] Loading HF: {cfg['id']} ({repo}, "
+              f"quant={hf_quant(cfg)}) ...")
 
         tok_kwargs = {"trust_remote_code": True}
+        self._tokenizer = AutoTokenizer.from_pretrained(repo, **tok_kwargs)
+        if self._tokenizer.pad_token is None:
+            self._tokenizer.pad_token = self._tokenizer.eos_token
+
+        self._added_tokens = tuple(self._tokenizer.get_added_vocab())
+
+        self._model = AutoModelForCausalLM.from_pretrained(
+            repo, **self._hf_model_kwargs(cfg)
+        )
+        self._model.eval()
+        if cfg.get("compile"):
+            self._compile_hf()
+
+        # Speculative decoding: a small model of the same tokenizer family
+        # drafts tokens that this one verifies in a single forward pass
+        draft = cfg.get("draft_cfg")
+        if draft is not None:
+            print(f"[ModelManager] Loading draft model {draft['id']} ...")
+            self._draft = AutoModelForCausalLM.from_pretrained(
+                draft["hf_repo"], **self._hf_model_kwargs(draft)
+            )
+            self._draft.eval()
+            self._draft_tokens = cfg.get("draft_tokens", 5)
+        print(f"[ModelManager] {cfg['id']} ready (HF).")
+
+    @staticmethod
+    def _hf_model_kwargs(cfg: dict) -> dict:
+        """from_pretrained() kwargs: dtype, attention and quantization."""
+        import torch
+        from transformers import BitsAndBytesConfig
+
+        quant = hf_quant(cfg)
+        # bf16 on Ampere+ (same tensor-core speed as fp16, no softmax
+        # overflow); fused SDPA attention unless attn_impl says otherwise
+        dtype = (
+            torch.bfloat16
+            if torch.cuda.is_available()
+            and torch.cuda.get_device_capability()[0] >= 8
+            else torch.float16
+        )
+        attn_impl = cfg.get("attn_impl", "sdpa")
+        if (attn_impl == "flash_attention_2"
+                and importlib.util.find_spec("flash_attn") is None):
+            print("[ModelManager] flash-attn not installed; using sdpa.")
+            attn_impl = "sdpa"
+
         mod_kwargs = {
             "trust_remote_code": True,
             "device_map": "auto",
-            "torch_dtype": torch.float16,
+            "torch_dtype": dtype,
+            "attn_implementation": attn_impl,
         }
 
         if quant == "4bit":
             bnb_cfg = BitsAndBytesConfig(
                 load_in_4bit=True,
                 bnb_4bit_quant_type="nf4",
-                bnb_4bit_compute_dtype=torch.float16,
+                bnb_4bit_compute_dtype=dtype,
                 bnb_4bit_use_double_quant=True,
             )
             mod_kwargs["quantization_config"] = bnb_cfg
-
-        self._tokenizer = AutoTokenizer.from_pretrained(repo, **tok_kwargs)
-        if self._tokenizer.pad_token is None:
-            self._tokenizer.pad_token = self._tokenizer.eos_token
-
-        self._model = AutoModelForCausalLM.from_pretrained(repo, **mod_kwargs)
-        self._model.eval()
-        print(f"[ModelManager] {cfg['id']} ready (HF).")
+        elif quant == "8bit":
+            mod_kwargs["quantization_config"] = BitsAndBytesConfig(
+                load_in_8bit=True,
+            )
+        return mod_kwargs
+
+    def _compile_hf(self) -> None:
+        """
+        torch.compile the model for decoding; graphs that fail to compile
+        fall back to eager instead of raising.
+
+        The repeated decoder blocks (`model.layers` on Llama/Qwen-style
+        models) are compiled one by one: they are identical, so the first
+        compile is reused by the rest and a model swap pays for one block
+        instead of the whole network. Other architectures get their whole
+        forward (which generate() calls per step) compiled. dynamic=True
+        avoids a recompile per prompt length.
+        """
+        import torch
+        import torch._dynamo
+
+        torch._dynamo.config.suppress_errors = True
+        try:
+            layers = getattr(self._model, "model", self._model).layers
+        except AttributeError:
+            layers = None
+        try:
+            if layers is not None:
+                for layer in layers:
+                    layer.compile(fullgraph=True, dynamic=True)
+            else:
+                self._model.forward = torch.compile(
+                    self._model.forward,
+                    mode="reduce-overhead", fullgraph=False, dynamic=True,
+                )
+        except Exception as e:
+            print(f"[ModelManager] torch.compile unavailable, "
+                  f"running eager: {e}")
 
     def _generate_hf(
         self, messages, max_new_tokens, temperature, top_p, top_k,
-        repetition_penalty,
+        repetition_penalty, stop=None,
     ) -> str:
+        return self._generate_hf_batch(
+            [messages], [max_new_tokens], temperature, top_p, top_k,
+            repetition_penalty, stop,
+        )[0]
+
+    def _generate_hf_batch(
+        self, messages_list, max_new_tokens, temperature, top_p, top_k,
+        repetition_penalty, stop=None,
+    ) -> list[str]:
+        """
+        Generate for several prompts in one model.generate() call.
+
+        Prompts are left-padded to a common length. max_new_tokens holds
+        one budget per prompt; the batch runs to the largest and each row
+        is cut back to its own budget.
+        """
+        import torch
+        from transformers import GenerationConfig
+
+        encoded = [
+            self._hf_encode(m, self._hf_prompt_cached(m))
+            for m in messages_list
+        ]
+        rows = [ids for ids, _ in encoded]
+        width = max(map(len, rows))
+        pad_id = self._tokenizer.pad_token_id
+        ids = torch.tensor([[pad_id] * (width - len(r)) + r for r in rows])
+        mask = torch.tensor(
+            [[0] * (width - len(r)) + [1] * len(r) for r in rows]
+        )
+        inputs = {
+            "input_ids": ids.to(self._model.device),
+            "attention_mask": mask.to(self._model.device),
+        }
+
+        cfg_key = (max(max_new_tokens), temperature, top_p, top_k,
+                   repetition_penalty, tuple(stop or ()))
+        gen_cfg = self._gen_cfgs.get(cfg_key)
+        if gen_cfg is None:
+            gen_cfg = self._gen_cfgs[cfg_key] = GenerationConfig(
+                max_new_tokens=max(max_new_tokens),
+                temperature=temperature,
+                top_p=top_p,
+                top_k=top_k,
+                repetition_penalty=repetition_penalty,
+                do_sample=True,
+                pad_token_id=pad_id,
+                stop_strings=stop or None,
+            )
+            if self._draft is not None:
+                gen_cfg.num_assistant_tokens = self._draft_tokens
+
+        # Assisted (speculative) generation takes one row at a time
+        if len(rows) == 1 and self._draft is not None:
+            inputs["assistant_model"] = self._draft
+        # A single unpadded prompt can start from the prefilled system
+        # turn; generate() then only runs prefill over the rest
+        ids0, n_prefix = encoded[0]
+        if len(rows) == 1 and n_prefix and self._draft is None:
+            past = self._hf_prefix_kv(
+                messages_list[0][0]["content"], ids0[:n_prefix]
+            )
+            if past is not None:
+                inputs["past_key_values"] = copy.deepcopy(past)
+
+        # HF keeps the matched stop string in the output tokens
+        with torch.no_grad():
+            out = self._model.generate(
+                **inputs, generation_config=gen_cfg, tokenizer=self._tokenizer,
+            )
+
+        texts, row_tokens = [], []
+        for row, budget in zip(out, max_new_tokens):
+            new_tokens = row[width:width + budget]
+            row_tokens.append(int((new_tokens != pad_id).sum()))
+            texts.append(self._tokenizer.decode(
+                new_tokens, skip_special_tokens=True
+            ).strip())
+        self._stats.value = {"row_tokens": row_tokens}
+        return texts
+
+    HF_PROMPT_CACHE = 256
+
+    def _hf_prompt_cached(self, messages: list[dict]) -> str:
+        """_hf_prompt() memoized by a digest of the messages (bounded)."""
+        key = hashlib.blake2b(
+            _json_body(messages), digest_size=16
+        ).digest()
+        prompt = self._prompts.get(key)
+        if prompt is None:
+            prompt = self._hf_prompt(messages)
+            if len(self._prompts) >= self.HF_PROMPT_CACHE:
+                del self._prompts[next(iter(self._prompts))]
+            self._prompts[key] = prompt
+        return prompt
+
+    def _hf_prompt(self, messages: list[dict]) -> str:
         if hasattr(self._tokenizer, "apply_chat_template"):
-            prompt = self._tokenizer.apply_chat_template(
+            return self._tokenizer.apply_chat_template(
                 messages, tokenize=False, add_generation_prompt=True
             )
-        else:
-            prompt = ""
-            for m in messages:
-                role, content = m["role"], m["content"]
-                if role == "system":
-                    prompt += f"System: {content}\n\n"
-                elif role == "user":
-                    prompt += f"User: {content}\n\n"
-                elif role == "assistant":
-                    prompt += f"Assistant: {content}\n\n"
-            prompt += "Assistant: "
-
-        inputs = self._tokenizer(prompt, return_tensors="pt").to(
-            self._model.device
-        )
-
-        gen_cfg = GenerationConfig(
-            max_new_tokens=max_new_tokens,
-            temperature=temperature,
-            top_p=top_p,
-            top_k=top_k,
-            repetition_penalty=repetition_penalty,
-            do_sample=True,
-            pad_token_id=self._tokenizer.pad_token_id,
+        prompt = ""
+        for m in messages:
+            role, content = m["role"], m["content"]
+            if role == "system":
+                prompt += f"System: {content}\n\n"
+            elif role == "user":
+                prompt += f"User: {content}\n\n"
+            elif role == "assistant":
+                prompt += f"Assistant: {content}\n\n"
+        return prompt + "Assistant: "
+
+    def _hf_batches(self, params_list: list[dict]) -> list[list[int]]:
+        """
+        Group request indices into HF batches of up to batch_size. Only
+        requests with the same sampling settings share a batch, and each
+        group is sorted by token budget so rows in a batch end close
+        together.
+        """
+        by_params: dict[tuple, list[int]] = {}
+        for i, p in enumerate(params_list):
+            key = tuple(
+                (k, tuple(v) if isinstance(v, list) else v)
+                for k, v in sorted(p.items()) if k != "max_new_tokens"
+            )
+            by_params.setdefault(key, []).append(i)
+        batches = []
+        for idx in by_params.values():
+            idx.sort(key=lambda i: params_list[i].get("max_new_tokens", 2048))
+            for start in range(0, len(idx), self.batch_size):
+                batches.append(idx[start:start + self.batch_size])
+        return batches
+
+    @staticmethod
+    def _batch_params(params: list[dict]) -> dict:
+        """generate() kwargs shared by a batch, with per-row budgets."""
+        shared = {
+            "temperature": 0.7, "top_p": 0.9, "top_k": 50,
+            "repetition_penalty": 1.1, "stop": None,
+        }
+        shared.update(
+            (k, v) for k, v in params[0].items() if k != "max_new_tokens"
         )
+        shared["max_new_tokens"] = [
+            p.get("max_new_tokens", 2048) for p in params
+        ]
+        return shared
+
+    def _hf_encode(
+        self, messages: list[dict], prompt: str,
+    ) -> tuple[list[int], int]:
+        """
+        Token ids for `prompt`, reusing the cached ids of its system turn,
+        and the number of leading ids that are that cached system turn
+        (0 if it wasn't split off). The split is only used where the
+        remainder starts with an added (special) token, so no BPE merge
+        can span it.
+        """
+        tok = self._tokenizer
+        if messages and messages[0]["role"] == "system":
+            sys_text = messages[0]["content"]
+            if sys_text not in self._prefix_ids:
+                try:
+                    head = tok.apply_chat_template(
+                        messages[:1], tokenize=False
+                    )
+                    self._prefix_ids[sys_text] = (
+                        head, tok(head)["input_ids"]
+                    )
+                except Exception:
+                    # Template can't render a lone system turn
+                    self._prefix_ids[sys_text] = (None, None)
+            head, head_ids = self._prefix_ids[sys_text]
+            if head is not None and prompt.startswith(head):
+                rest = prompt[len(head):]
+                if rest.startswith(self._added_tokens):
+                    rest_ids = tok(rest, add_special_tokens=False)["input_ids"]
+                    return head_ids + rest_ids, len(head_ids)
+        return tok(prompt)["input_ids"], 0
+
+    def _hf_prefix_kv(self, sys_text: str, head_ids: list[int]):
+        """KV cache of the system turn, prefilled once per system message."""
+        if sys_text not in self._prefix_kv:
+            import torch
 
-        with torch.no_grad():
-            out = self._model.generate(**inputs, generation_config=gen_cfg)
+            try:
+                ids = torch.tensor([head_ids], device=self._model.device)
+                with torch.no_grad():
+                    past = self._model(ids, use_cache=True).past_key_values
+            except Exception as e:
+                print(f"[ModelManager] Prefix KV cache unavailable: {e}")
+                past = None
+            self._prefix_kv[sys_text] = past
+        return self._prefix_kv[sys_text]
+
+    # ── Secondary models ────────────────────────────────────
+
+    VRAM_HEADROOM_GB = 1.0
+
+    def _fits_alongside(self, cfg: dict) -> bool:
+        if cfg.get("backend", "ollama") == "ollama":
+            return True
+        try:
+            import torch as _torch
+            if not _torch.cuda.is_available():
+                return False
+            free_gb = _torch.cuda.mem_get_info()[0] / 1024**3
+        except ImportError:
+            return False
+        return cfg.get("vram_est", float("inf")) + self.VRAM_HEADROOM_GB <= free_gb
 
-        new_tokens = out[0][inputs["input_ids"].shape[1]:]
-        text = self._tokenizer.decode(new_tokens, skip_special_tokens=True)
-        return text.strip()
+    def _drop_secondary(self, mid: str) -> None:
+        sub = self._secondary.pop(mid, None)
+        if sub is not None:
+            sub._unload()
 
     # ── Cleanup ─────────────────────────────────────────────
 
@@ -431,9 +1258,14 @@ class ModelManager:
 
         print(f"[ModelManager] Unloading {self._current_id} ...")
 
+        in_process = self._backend in ("gguf", "hf")
         if self._backend == "ollama":
-            # Ollama manages its own memory — nothing to free
+            # Ollama manages its own memory — only drop idle connections
+            # when no other resident model still talks to the server
             self._model = None
+            if not any(sub._backend == "ollama"
+                       for sub in self._secondary.values()):
+                _ollama_close_all()
         elif self._backend == "gguf":
             del self._model
             self._model = None
@@ -442,15 +1274,40 @@ class ModelManager:
             del self._tokenizer
             self._model = None
             self._tokenizer = None
+            self._draft = None
+            self._prefix_ids.clear()
+            self._prefix_kv.clear()
+            self._gen_cfgs.clear()
+            self._prompts.clear()
+            self._added_tokens = ()
 
         self._current_id = None
         self._backend = None
-
-        gc.collect()
-        try:
-            import torch as _torch
-            if _torch.cuda.is_available():
-                _torch.cuda.empty_cache()
-                _torch.cuda.synchronize()
-        except ImportError:
-            pass
+        self._current_cfg = None
+
+        if in_process:
+            self._release_memory()
+
+    # Below this free fraction of GPU memory, an unload hands cached blocks
+    # back to the driver (for llama.cpp, Ollama or the next load)
+    CUDA_FREE_MIN_FRAC = 0.2
+
+    def _release_memory(self) -> None:
+        """
+        After dropping a GGUF/HF model: without torch (GGUF only), collect
+        so llama.cpp frees its buffers. With torch, the caching allocator
+        reuses freed blocks for the next load, so the collect +
+        empty_cache() + synchronize() stall is only paid when the GPU is
+        short on free memory or PIPELINE_EMPTY_CUDA_CACHE=1.
+        """
+        # Only if a GGUF/HF load already pulled torch in
+        _torch = sys.modules.get("torch")
+        if _torch is None or not _torch.cuda.is_available():
+            gc.collect()
+            return
+        free, total = _torch.cuda.mem_get_info()
+        if (os.environ.get("PIPELINE_EMPTY_CUDA_CACHE") == "1"
+                or free / total < self.CUDA_FREE_MIN_FRAC):
+            gc.collect()
+            _torch.cuda.empty_cache()
+            _torch.cuda.synchronize()
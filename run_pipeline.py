@@ -20,20 +20,31 @@ Usage:
 
 import argparse
 import itertools
+import json
 import os
 import random
+import shutil
 import sys
 import time
 import yaml
-
-from seed_generator import get_seeds, load_custom_seeds
-from cot_generator import generate_cot_batch
-from model_manager import ModelManager
+from collections import defaultdict
+from pathlib import Path
+
+from seed_generator import get_seeds, iter_custom_seeds
+from cot_generator import BudgetTracker, generate_cot_batch
+from model_manager import (
+    INDUCTOR_CACHE_DIR,
+    OLLAMA_KEEP_ALIVE,
+    ModelManager,
+    hf_quant,
+)
 from dataset_writer import (
     save_parquet,
     save_jsonl,
     append_checkpoint,
-    load_checkpoint,
+    checkpoint_path,
+    checkpoint_size,
+    iter_checkpoint,
     print_stats,
     push_to_hub,
 )
@@ -51,11 +62,23 @@ class ModelSelector:
         self.models = eligible_models
         self.strategy = strategy
         self._call_count = 0
+        # role → (pool, cumulative max_cot weights), built on first pick
+        self._pools: dict[str, tuple[list[dict], list[int]]] = {}
+
+    def _pool(self, role: str) -> tuple[list[dict], list[int]]:
+        if role not in self._pools:
+            pool = [m for m in self.models
+                    if role in m.get("roles", ["generator"])]
+            if not pool:
+                pool = self.models
+            cum = list(itertools.accumulate(
+                m.get("max_cot", 4096) for m in pool
+            ))
+            self._pools[role] = (pool, cum)
+        return self._pools[role]
 
     def pick(self, role: str = "generator") -> dict:
-        pool = [m for m in self.models if role in m.get("roles", ["generator"])]
-        if not pool:
-            pool = self.models
+        pool, cum_weights = self._pool(role)
 
         if self.strategy == "random":
             return random.choice(pool)
@@ -64,8 +87,7 @@ class ModelSelector:
             self._call_count += 1
             return pool[idx]
         elif self.strategy == "weighted":
-            weights = [m.get("max_cot", 4096) for m in pool]
-            return random.choices(pool, weights=weights, k=1)[0]
+            return random.choices(pool, cum_weights=cum_weights, k=1)[0]
         elif self.strategy == "fixed":
             return pool[0]
         else:
@@ -114,6 +136,41 @@ def resolve_model(models: list[dict], model_id: str) -> dict:
     )
 
 
+# Approximate weight bits per HF `quant` setting, for rescaling vram_est
+QUANT_BITS = {"none": 16, "8bit": 8, "4bit": 4}
+
+
+def verifier_variant(cfg: dict) -> dict:
+    """
+    Apply a model's `verifier_quant` when it is used as the verifier.
+    The verifier only emits a score, so a lower-precision load costs
+    nothing in output quality and frees VRAM to keep it resident.
+    Only HF models are re-quantized; Ollama / GGUF weights are fixed by
+    the tag or file.
+    """
+    quant = cfg.get("verifier_quant")
+    if not quant or cfg["backend"] != "hf":
+        return cfg
+    old_bits = QUANT_BITS.get(hf_quant(cfg), 16)
+    new_bits = QUANT_BITS.get(quant, old_bits)
+    return {
+        **cfg,
+        "quant": quant,
+        "vram_est": round(cfg.get("vram_est", 0) * new_bits / old_bits, 1),
+    }
+
+
+def with_draft(cfg: dict, models: list[dict]) -> dict:
+    """
+    Resolve an HF model's `draft_model` id to that pool entry, which
+    ModelManager loads alongside it for speculative decoding. (GGUF's
+    `draft_model: prompt_lookup` needs no second model.)
+    """
+    if cfg["backend"] != "hf" or not cfg.get("draft_model"):
+        return cfg
+    return {**cfg, "draft_cfg": resolve_model(models, cfg["draft_model"])}
+
+
 # ================================================================
 # Main
 # ================================================================
@@ -155,10 +212,19 @@ def main():
     parser.add_argument("--custom-seeds", default=None)
     parser.add_argument("--validate", action="store_true", help="Run quality & diversity validation suite")
     parser.add_argument("--judge", default="deepseek-r1-8b", help="Model ID used as LLM-as-a-Judge")
+    parser.add_argument("--embedding-model", default=None, metavar="MODEL",
+                        help="Sentence-transformers model for embedding diversity "
+                             "(Remote-Clique / Chamfer) during --validate")
     parser.add_argument("--dry-run", action="store_true")
+    parser.add_argument("--clear-compile-cache", action="store_true",
+                        help="Delete cached torch.compile graphs first")
 
     args = parser.parse_args()
 
+    if args.clear_compile_cache:
+        shutil.rmtree(INDUCTOR_CACHE_DIR, ignore_errors=True)
+        print(f"Cleared compile cache: {INDUCTOR_CACHE_DIR}")
+
     # ── Load config ─────────────────────────────────────────
     config = load_config(args.config)
     gen = config["generation"]
@@ -190,7 +256,10 @@ def main():
 
     # ── Filter models ───────────────────────────────────────
     all_models = config["models"]
-    eligible = filter_models(all_models, gpu_tier, backend_filter)
+    eligible = [
+        with_draft(m, all_models)
+        for m in filter_models(all_models, gpu_tier, backend_filter)
+    ]
 
     if args.model and strategy == "fixed":
         fixed = resolve_model(eligible, args.model)
@@ -212,6 +281,7 @@ def main():
             verifier_cfg = resolve_model(all_models, args.verifier)
         else:
             verifier_cfg = min(eligible, key=lambda m: m.get("vram_est", 99))
+        verifier_cfg = verifier_variant(verifier_cfg)
 
     # ── Plan summary ────────────────────────────────────────
     print("\n" + "=" * 70)
@@ -220,10 +290,15 @@ def main():
     print(f"  Skills           : {[s['id'] for s in skills]}")
     print(f"  GPU tier         : {gpu_tier}")
     print(f"  Backend          : {backend_filter}")
+    if backend_filter in ("ollama", "all"):
+        print(f"  Ollama keep-alive: {OLLAMA_KEEP_ALIVE}")
     print(f"  Model strategy   : {selector.describe()}")
     print(f"  Context mode     : {ctx_mode}")
     if verifier_cfg:
-        print(f"  Verifier         : {verifier_cfg['id']}")
+        quant = (hf_quant(verifier_cfg)
+                 if verifier_cfg["backend"] == "hf" else None)
+        print(f"  Verifier         : {verifier_cfg['id']}"
+              + (f" ({quant})" if quant and quant != "none" else ""))
     print(f"  Samples/seed     : {samples_per_seed}")
     print(f"  Max seeds/skill  : {args.max_seeds or 'all'}")
     print(f"  Output           : {output_dir} ({output_format})")
@@ -253,7 +328,7 @@ def main():
     if args.dry_run:
         total_records = 0
         for skill in skills:
-            seeds = get_seeds(skill, limit=args.max_seeds)
+            seeds = get_seeds(skill, limit=args.max_seeds, copy=False)
             n = len(seeds) * samples_per_seed
             total_records += n
             print(f"\n  {skill['id']:20s}  {len(seeds)} seeds × "
@@ -263,15 +338,31 @@ def main():
         return
 
     # ── Resume ──────────────────────────────────────────────
-    all_records = []
+    # Records are not held in memory: each batch goes to the checkpoint
+    # JSONL and the final outputs stream back from it. A fresh run reads
+    # only what it appends (from `start`); a resumed one the whole file.
     done_ids = set()
+    record_count = 0
+    start = checkpoint_size(output_dir)
     if args.resume:
-        all_records = load_checkpoint(output_dir)
-        done_ids = {r["synth_id"] for r in all_records}
+        start = 0
+        for r in iter_checkpoint(output_dir):
+            done_ids.add(r["synth_id"])
+            record_count += 1
+        print(f"[Writer] Resumed {record_count} records from checkpoint.")
 
     # ── Generate ────────────────────────────────────────────
-    mgr = ModelManager()
+    mgr = ModelManager(
+        max_parallel=gen.get("ollama_parallel"),
+        batch_size=gen.get("batch_size", 1),
+    )
     checkpoint_every = gen.get("checkpoint_every", 50)
+    # Stream each record into the checkpoint as soon as it is generated
+    # instead of checkpointing every `checkpoint_every` records
+    stream_path = (
+        checkpoint_path(output_dir)
+        if gen.get("stream_records", False) else None
+    )
     total_start = time.time()
 
     for skill in skills:
@@ -282,106 +373,95 @@ def main():
         print(f"{'─'*70}")
 
         if args.custom_seeds:
-            seeds = load_custom_seeds(args.custom_seeds, skill)
+            seeds = iter_custom_seeds(args.custom_seeds, skill)
         else:
-            seeds = get_seeds(skill, limit=args.max_seeds)
+            seeds = get_seeds(skill, limit=args.max_seeds, copy=False)
 
         seeds = [s for s in seeds if s["synth_id"] not in done_ids]
         if not seeds:
             print("  (all done, skipping)")
             continue
 
-        # Expand for samples_per_seed
+        # Expand for samples_per_seed (seeds are only read from here on,
+        # so the first sample uses the seed itself)
         expanded = []
         for s in seeds:
-            for v in range(samples_per_seed):
-                c = {**s}
-                if v > 0:
-                    c["synth_id"] = f"{s['synth_id']}_v{v}"
-                expanded.append(c)
+            expanded.append(s)
+            for v in range(1, samples_per_seed):
+                expanded.append({**s, "synth_id": f"{s['synth_id']}_v{v}"})
 
         # ── Assign model per seed ───────────────────────────
-        # Each seed gets its own model pick. Then we sort by model
-        # to minimise swap overhead, while preserving per-seed diversity.
-        seed_assignments = []
+        # Each seed gets its own model pick, bucketed by model so each
+        # model runs its seeds as one batch (one load per model), while
+        # preserving per-seed diversity.
+        buckets: dict[str, list[dict]] = defaultdict(list)
         for seed in expanded:
-            chosen = selector.pick(role="generator")
-            seed_assignments.append((chosen["id"], seed))
-
-        # Sort by model ID so consecutive seeds use same model
-        seed_assignments.sort(key=lambda x: x[0])
+            buckets[selector.pick(role="generator")["id"]].append(seed)
 
         # Show distribution
-        from collections import Counter
-        dist = Counter(mid for mid, _ in seed_assignments)
         print(f"  Model assignments:")
-        for mid, count in dist.most_common():
-            print(f"    {mid:<30} → {count} seeds")
-
-        # Generate in model-sorted order
-        current_model_id = None
-        current_model_cfg = None
-        batch_seeds = []
-        flush_count = 0
-
-        def flush_batch():
-            nonlocal all_records, done_ids, flush_count
-            if not batch_seeds or current_model_cfg is None:
-                return
+        for mid, batch in sorted(buckets.items(), key=lambda kv: -len(kv[1])):
+            print(f"    {mid:<30} → {len(batch)} seeds")
+
+        pending = []
+        # Learns this skill's typical CoT length to trim oversized budgets
+        budget = (
+            BudgetTracker(floor=gen.get("min_reasoning_tokens", 0))
+            if gen.get("adaptive_budget", False) else None
+        )
+
+        def flush_batch(model_cfg, batch_seeds):
+            nonlocal record_count
             records = generate_cot_batch(
                 seeds=batch_seeds,
-                model_cfg=current_model_cfg,
+                model_cfg=model_cfg,
                 mgr=mgr,
                 gen_settings=gen,
                 ctx_profiles=ctx_profiles,
                 verifier_cfg=verifier_cfg,
+                out_path=stream_path,
+                budget=budget,
             )
-            all_records.extend(records)
+            if stream_path:
+                # Already in the checkpoint: one record per seed
+                record_count += len(batch_seeds)
+                done_ids.update(s["synth_id"] for s in batch_seeds)
+                return
+            pending.extend(records)
+            record_count += len(records)
             done_ids.update(r["synth_id"] for r in records)
-            flush_count += len(records)
-
-            if flush_count >= checkpoint_every:
-                append_checkpoint(
-                    all_records[-flush_count:], output_dir
-                )
-                print(f"  [checkpoint] {len(all_records)} total records")
-                flush_count = 0
 
-        for mid, seed in seed_assignments:
-            if mid != current_model_id:
-                # Flush previous batch
-                flush_batch()
-                batch_seeds = []
-                current_model_id = mid
-                current_model_cfg = resolve_model(eligible, mid)
+            if len(pending) >= checkpoint_every:
+                append_checkpoint(pending, output_dir)
+                print(f"  [checkpoint] {record_count} total records")
+                pending.clear()
 
-            batch_seeds.append(seed)
-
-        # Flush last batch
-        flush_batch()
+        for mid, batch_seeds in buckets.items():
+            flush_batch(resolve_model(eligible, mid), batch_seeds)
 
         # Final checkpoint for any remaining
-        if flush_count > 0:
-            append_checkpoint(
-                all_records[-flush_count:], output_dir
-            )
-            print(f"  [checkpoint] {len(all_records)} total records")
+        if pending:
+            append_checkpoint(pending, output_dir, fsync=True)
+            print(f"  [checkpoint] {record_count} total records")
 
     # ── Final output ────────────────────────────────────────
     elapsed = time.time() - total_start
     print(f"\n[Pipeline] Done in {elapsed/60:.1f} min.")
 
-    if not all_records:
+    if not record_count:
         print("[Pipeline] No records generated.")
         return
 
+    def records():
+        return iter_checkpoint(output_dir, start)
+
     parquet_path = None
     if output_format in ("parquet", "both"):
-        parquet_path = save_parquet(all_records, output_dir)
+        parquet_path = save_parquet(records(), output_dir)
     if output_format in ("jsonl", "both"):
-        save_jsonl(all_records, output_dir)
+        save_jsonl(records(), output_dir)
 
-    print_stats(all_records)
+    print_stats(records())
 
     if args.push_to_hub and parquet_path:
         token = args.hf_token or os.environ.get("HF_TOKEN")
@@ -397,10 +477,10 @@ def main():
         
         # We need seeds attached to records for the validator
         # generate_cot_batch currently returns dicts without the full seed dict
-        # Actually it has most fields. Let's wrap them.
-        validation_samples = []
-        for r in all_records:
-            validation_samples.append({
+        # Actually it has most fields. Let's wrap them — lazily: the
+        # validator streams them once, so the dataset isn't held in memory.
+        validation_samples = (
+            {
                 "seed": {
                     "query": r["query"],
                     "seed_text": r["query_seed_text"],
@@ -409,9 +489,11 @@ def main():
                 },
                 "completion": r["synthetic_reasoning"] + "\n" + r["synthetic_answer"],
                 "skill_id": r["skill_id"]
-            })
+            }
+            for r in records()
+        )
             
-        validator = ValidationFramework(val_mgr)
+        validator = ValidationFramework(val_mgr, embedding_model=args.embedding_model)
         val_results = validator.validate_dataset(validation_samples, judge_cfg)
         
         val_path = Path(output_dir) / "validation_report.json"
@@ -419,6 +501,11 @@ def main():
             json.dump(val_results, f, indent=2)
             
         print(f"\n[Validator] Diversity Score (Unique 3-grams): {val_results['diversity_score']:.2f}")
+        print(f"[Validator] 3-gram Entropy: {val_results['ngram_entropy']:.2f} bits")
+        if "embedding_diversity" in val_results:
+            emb = val_results["embedding_diversity"]
+            print(f"[Validator] Embedding Diversity: Remote-Clique {emb['remote_clique']:.3f}  "
+                  f"|  Chamfer {emb['chamfer']:.3f}")
         print(f"[Validator] Averages: {val_results['averages']}")
         print(f"[Validator] Report saved to: {val_path}")
         print("=" * 70)
@@ -5,858 +5,466 @@ Seeds are the raw material fed into the COT generation pipeline.
 Each seed is a dict with at minimum: query, seed_text, language, constraints.
 """
 
-import json
-import random
+import functools
+import itertools
+import mmap
+import os
+import sys
 import hashlib
 from pathlib import Path
+from types import MappingProxyType
+from typing import Iterator
+
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    import json
+    _json_loads = json.loads
 
 # ════════════════════════════════════════════════════════════
 # Built-in seed banks per source type
 # ════════════════════════════════════════════════════════════
 
-# ── MATHEMATICS ──────────────────────────────────────────────
-
-MATH_SEEDS = [
-    {
-        "query": "A shopkeeper buys 45 notebooks at ₹12 each and sells them at ₹18 each. What is the total profit?",
-        "seed_text": "",
-        "language": "en",
-        "constraints": "Show all arithmetic steps.",
-        "seed_url": "synthetic/math",
-    },
-    {
-        "query": "A train travels 360 km in 4 hours. It then travels another 240 km in 3 hours. What is the average speed for the entire journey?",
-        "seed_text": "",
-        "language": "en",
-        "constraints": "Use distance = speed × time.",
-        "seed_url": "synthetic/math",
-    },
-    {
-        "query": "If 3x + 7 = 22, what is the value of x?",
-        "seed_text": "",
-        "language": "en",
-        "constraints": "Solve step by step.",
-        "seed_url": "synthetic/math",
-    },
-    {
-        "query": "एक दुकानदार ने 200 रुपये में 5 किलो चावल खरीदे और 250 रुपये में बेच दिए। लाभ प्रतिशत क्या है?",
-        "seed_text": "",
-        "language": "hi",
-        "constraints": "सभी गणना चरण दिखाएं।",
-        "seed_url": "synthetic/math",
-    },
-    {
-        "query": "A rectangular garden is 15m long and 8m wide. A path 2m wide is built around it. What is the area of the path?",
-        "seed_text": "",
-        "language": "en",
-        "constraints": "Draw conceptual diagram in text. Show all steps.",
-        "seed_url": "synthetic/math",
-    },
-    {
-        "query": "Three friends split a bill of $147 equally. They each leave a 15% tip on their share. How much does each person pay in total?",
-        "seed_text": "",
-        "language": "en",
-        "constraints": "",
-        "seed_url": "synthetic/math",
-    },
-    {
-        "query": "A tank is filled by pipe A in 6 hours and pipe B in 8 hours. If both pipes are opened together, how long to fill the tank?",
-        "seed_text": "",
-        "language": "en",
-        "constraints": "Use rate = 1/time approach.",
-        "seed_url": "synthetic/math",
-    },
-    {
-        "query": "Find the compound interest on ₹10,000 at 10% per annum for 2 years, compounded annually.",
-        "seed_text": "",
-        "language": "en",
-        "constraints": "Use CI = P(1+r/n)^(nt) - P",
-        "seed_url": "synthetic/math",
-    },
-]
-
-MATH_TEXTBOOK_SEEDS = [
-    {
-        "query": "Prove that the sum of angles in a triangle equals 180 degrees using Euclidean geometry.",
-        "seed_text": "",
-        "language": "en",
-        "constraints": "Use formal proof structure with axioms and theorems.",
-        "seed_url": "synthetic/math_textbook",
-    },
-    {
-        "query": "Derive the quadratic formula from the general form ax² + bx + c = 0 using completing the square.",
-        "seed_text": "",
-        "language": "en",
-        "constraints": "Show every algebraic step clearly.",
-        "seed_url": "synthetic/math_textbook",
-    },
-    {
-        "query": "Calculate the limit: lim(x→0) (sin(x)/x). Use L'Hôpital's rule or series expansion.",
-        "seed_text": "",
-        "language": "en",
-        "constraints": "Justify each step mathematically.",
-        "seed_url": "synthetic/math_textbook",
-    },
-    {
-        "query": "Find the derivative of f(x) = x³ + 2x² - 5x + 7 from first principles.",
-        "seed_text": "",
-        "language": "en",
-        "constraints": "Use the definition of derivative as a limit.",
-        "seed_url": "synthetic/math_textbook",
-    },
-]
-
-# ── LOGIC & REASONING ────────────────────────────────────────
-
-LOGIC_SEEDS = [
-    {
-        "query": "All roses are flowers. Some flowers fade quickly. Can we conclude that some roses fade quickly?",
-        "seed_text": "P1: All roses are flowers.\nP2: Some flowers fade quickly.",
-        "language": "en",
-        "constraints": "",
-        "seed_url": "synthetic/logic",
-    },
-    {
-        "query": "If it rains, the ground is wet. The ground is not wet. What can we conclude?",
-        "seed_text": "P1: Rain → Wet ground\nP2: ¬Wet ground",
-        "language": "en",
-        "constraints": "Name the inference rule used.",
-        "seed_url": "synthetic/logic",
-    },
-    {
-        "query": "Either the butler or the gardener committed the crime. The gardener was in another city. Who committed the crime?",
-        "seed_text": "P1: Butler ∨ Gardener\nP2: ¬Gardener (alibi confirmed)",
-        "language": "en",
-        "constraints": "",
-        "seed_url": "synthetic/logic",
-    },
-    {
-        "query": "No mammals are cold-blooded. All whales are mammals. Are any whales cold-blooded?",
-        "seed_text": "P1: Mammal → ¬Cold-blooded\nP2: Whale → Mammal",
-        "language": "en",
-        "constraints": "Use syllogistic reasoning.",
-        "seed_url": "synthetic/logic",
-    },
-]
-
-# ── SCIENCE DOMAINS ──────────────────────────────────────────
-
-PHYSICS_SEEDS = [
-    {
-        "query": "A ball is thrown upward with an initial velocity of 20 m/s. Calculate the maximum height reached and time to reach it. (g = 10 m/s²)",
-        "seed_text": "",
-        "language": "en",
-        "constraints": "Use kinematic equations. Show all steps.",
-        "seed_url": "synthetic/physics",
-    },
-    {
-        "query": "Explain why astronauts feel weightless in orbit, even though Earth's gravity still acts on them.",
-        "seed_text": "",
-        "language": "en",
-        "constraints": "Discuss free fall and orbital mechanics.",
-        "seed_url": "synthetic/physics",
-    },
-    {
-        "query": "A 5 kg block slides down a frictionless incline of 30°. Calculate the acceleration and force components.",
-        "seed_text": "",
-        "language": "en",
-        "constraints": "Draw free body diagram. Use Newton's laws.",
-        "seed_url": "synthetic/physics",
-    },
-    {
-        "query": "Derive the relationship between wavelength, frequency, and wave speed for electromagnetic waves.",
-        "seed_text": "",
-        "language": "en",
-        "constraints": "Include the fundamental wave equation.",
-        "seed_url": "synthetic/physics",
-    },
-]
-
-CHEMISTRY_SEEDS = [
-    {
-        "query": "Balance this chemical equation: C₃H₈ + O₂ → CO₂ + H₂O. Explain the law of conservation of mass.",
-        "seed_text": "",
-        "language": "en",
-        "constraints": "Show step-by-step balancing process.",
-        "seed_url": "synthetic/chemistry",
-    },
-    {
-        "query": "Calculate the pH of a 0.01 M HCl solution. Explain the relationship between [H⁺] and pH.",
-        "seed_text": "",
-        "language": "en",
-        "constraints": "Use pH = -log[H⁺]",
-        "seed_url": "synthetic/chemistry",
-    },
-    {
-        "query": "Explain why ionic compounds have high melting points while covalent compounds generally have lower melting points.",
-        "seed_text": "",
-        "language": "en",
-        "constraints": "Discuss bonding and intermolecular forces.",
-        "seed_url": "synthetic/chemistry",
-    },
-    {
-        "query": "What is the electron configuration of Iron (Fe, atomic number 26)? Explain using Aufbau principle.",
-        "seed_text": "",
-        "language": "en",
-        "constraints": "Show orbital filling order.",
-        "seed_url": "synthetic/chemistry",
-    },
-]
-
-BIOLOGY_SEEDS = [
-    {
-        "query": "Explain the process of photosynthesis, including light-dependent and light-independent reactions.",
-        "seed_text": "",
-        "language": "en",
-        "constraints": "Include chemical equations and location in chloroplast.",
-        "seed_url": "synthetic/biology",
-    },
-    {
-        "query": "Describe the structure and function of DNA. How does DNA replication ensure genetic continuity?",
-        "seed_text": "",
-        "language": "en",
-        "constraints": "Discuss double helix, base pairing, and semi-conservative replication.",
-        "seed_url": "synthetic/biology",
-    },
-    {
-        "query": "What is the difference between mitosis and meiosis? Why is meiosis important for sexual reproduction?",
-        "seed_text": "",
-        "language": "en",
-        "constraints": "Compare stages and outcomes of both processes.",
-        "seed_url": "synthetic/biology",
-    },
-    {
-        "query": "Explain how natural selection leads to evolution. Use Darwin's finches as an example.",
-        "seed_text": "",
-        "language": "en",
-        "constraints": "Discuss variation, inheritance, and differential survival.",
-        "seed_url": "synthetic/biology",
-    },
-]
-
-# ── LEGAL & ETHICS ───────────────────────────────────────────
-
-LEGAL_SEEDS = [
-    {
-        "query": "Analyze the doctrine of 'Basic Structure' in Indian constitutional law. What are its key principles?",
-        "seed_text": "The Basic Structure doctrine was established in Kesavananda Bharati v. State of Kerala (1973), holding that certain fundamental features of the Constitution cannot be amended by Parliament.",
-        "language": "en",
-        "constraints": "Cite relevant case law and constitutional provisions.",
-        "seed_url": "synthetic/legal",
-    },
-    {
-        "query": "What constitutes 'consideration' in contract law? Is past consideration valid?",
-        "seed_text": "",
-        "language": "en",
-        "constraints": "Use Indian Contract Act, 1872 provisions.",
-        "seed_url": "synthetic/legal",
-    },
-    {
-        "query": "Explain the difference between 'mens rea' and 'actus reus' in criminal law with examples.",
-        "seed_text": "",
-        "language": "en",
-        "constraints": "Provide case examples from Indian Penal Code.",
-        "seed_url": "synthetic/legal",
-    },
-    {
-        "query": "भारतीय संविधान के अनुच्छेद 21 में 'जीवन का अधिकार' की व्याख्या करें।",
-        "seed_text": "",
-        "language": "hi",
-        "constraints": "प्रमुख मामलों का उल्लेख करें।",
-        "seed_url": "synthetic/legal",
-    },
-]
-
-ETHICS_SEEDS = [
-    {
-        "query": "A self-driving car must choose between hitting a pedestrian or swerving and harming its passenger. Analyze this using utilitarian and deontological frameworks.",
-        "seed_text": "",
-        "language": "en",
-        "constraints": "Compare both ethical frameworks and their conclusions.",
-        "seed_url": "synthetic/ethics",
-    },
-    {
-        "query": "Is it ethical for a doctor to lie to a terminally ill patient about their prognosis if the truth might cause severe psychological harm?",
-        "seed_text": "",
-        "language": "en",
-        "constraints": "Consider medical ethics principles: autonomy, beneficence, non-maleficence.",
-        "seed_url": "synthetic/ethics",
-    },
-    {
-        "query": "Discuss the ethics of whistleblowing. When is it morally justified to expose organizational wrongdoing?",
-        "seed_text": "",
-        "language": "en",
-        "constraints": "Balance loyalty, public interest, and consequences.",
-        "seed_url": "synthetic/ethics",
-    },
-]
-
-# ── CODING & SOFTWARE ────────────────────────────────────────
-
-CODING_SEEDS = [
-    {
-        "query": "Write a Python function to find the longest palindromic substring in a given string. Optimize for time complexity.",
-        "seed_text": "",
-        "language": "en",
-        "constraints": "Include time/space complexity analysis. Provide test cases.",
-        "seed_url": "synthetic/coding",
-    },
-    {
-        "query": "Debug this code: Why does it produce incorrect output?\n\ndef factorial(n):\n    if n == 1:\n        return 1\n    return n * factorial(n-1)",
-        "seed_text": "",
-        "language": "en",
-        "constraints": "Identify the bug and provide corrected version.",
-        "seed_url": "synthetic/coding",
-    },
-    {
-        "query": "Implement a binary search algorithm in Python. Explain why it's O(log n) time complexity.",
-        "seed_text": "",
-        "language": "en",
-        "constraints": "Include edge cases and complexity proof.",
-        "seed_url": "synthetic/coding",
-    },
-    {
-        "query": "Design a REST API endpoint for user authentication. What HTTP methods and status codes would you use?",
-        "seed_text": "",
-        "language": "en",
-        "constraints": "Consider security best practices (hashing, tokens).",
-        "seed_url": "synthetic/coding",
-    },
-]
-
-# ── POLITICS & NEWS ──────────────────────────────────────────
-
-POLITICS_SEEDS = [
-    {
-        "query": "Analyze the separation of powers doctrine in parliamentary vs. presidential systems. Use India and USA as examples.",
-        "seed_text": "",
-        "language": "en",
-        "constraints": "Compare executive-legislative relationships.",
-        "seed_url": "synthetic/politics",
-    },
-    {
-        "query": "What are the key differences between federalism in India and the United States?",
-        "seed_text": "",
-        "language": "en",
-        "constraints": "Discuss distribution of powers and constitutional provisions.",
-        "seed_url": "synthetic/politics",
-    },
-    {
-        "query": "भारत में चुनाव आयोग की भूमिका और शक्तियों का विश्लेषण करें।",
-        "seed_text": "",
-        "language": "hi",
-        "constraints": "संवैधानिक प्रावधानों का उल्लेख करें।",
-        "seed_url": "synthetic/politics",
-    },
-]
-
-NEWS_SEEDS = [
-    {
-        "query": "Fact-check this claim: 'India became the first country to land on the south pole of the Moon.'",
-        "seed_text": "Chandrayaan-3's Vikram lander touched down near the lunar south pole on August 23, 2023.",
-        "language": "en",
-        "constraints": "Verify accuracy, provide sources, rate as True/False/Partially True.",
-        "seed_url": "synthetic/news",
-    },
-    {
-        "query": "Analyze potential bias in this news headline: 'Government's Bold Economic Reforms Set to Transform Nation'",
-        "seed_text": "",
-        "language": "en",
-        "constraints": "Identify loaded language, missing context, and perspective.",
-        "seed_url": "synthetic/news",
-    },
-    {
-        "query": "Summarize the key points of this news article and identify the 5W1H (Who, What, When, Where, Why, How).",
-        "seed_text": "The Reserve Bank of India raised the repo rate by 25 basis points to 6.75% on February 8, 2024, citing persistent inflation concerns. Governor Shaktikanta Das stated that the decision aims to anchor inflation expectations while supporting growth.",
-        "language": "en",
-        "constraints": "Extract factual information systematically.",
-        "seed_url": "synthetic/news",
-    },
-]
-
-# ── INDIAN LANGUAGES: LEXICAL & SYNTACTIC ────────────────────
-
-HINDI_LEX_SEEDS = [
-    {
-        "query": "इस वाक्य का वाक्य-विश्लेषण करें और कर्ता, क्रिया, कर्म पहचानें।",
-        "seed_text": "राम ने बाजार से पाँच किलो आम खरीदे।",
-        "language": "hi",
-        "constraints": "",
-        "seed_url": "synthetic/hindi_lex",
-    },
-    {
-        "query": "Identify the sandhi and samas in this Hindi compound word and break it down.",
-        "seed_text": "विद्यालय (विद्या + आलय)",
-        "language": "hi",
-        "constraints": "Show morpheme boundaries.",
-        "seed_url": "synthetic/hindi_lex",
-    },
-    {
-        "query": "Parse the postpositions and case markers in this sentence.",
-        "seed_text": "लड़की ने किताब को मेज पर रखा।",
-        "language": "hi",
-        "constraints": "",
-        "seed_url": "synthetic/hindi_lex",
-    },
-    {
-        "query": "Identify verb forms and tense/aspect/mood markers.",
-        "seed_text": "वह कल स्कूल जा रहा होगा।",
-        "language": "hi",
-        "constraints": "Mark TAM morphemes.",
-        "seed_url": "synthetic/hindi_lex",
-    },
-]
-
-TAMIL_LEX_SEEDS = [
-    {
-        "query": "இந்த வாக்கியத்தின் இலக்கண அமைப்பை பகுத்தாய்வு செய்யவும்.",
-        "seed_text": "குழந்தை பள்ளிக்கு சென்றது.",
-        "language": "ta",
-        "constraints": "வினை, பெயர், வேற்றுமை உருபுகளை அடையாளம் காணவும்.",
-        "seed_url": "synthetic/tamil_lex",
-    },
-    {
-        "query": "Identify the agglutinative morphemes in this Tamil word.",
-        "seed_text": "பள்ளிக்கூடத்திலிருந்து (from the school)",
-        "language": "ta",
-        "constraints": "Break down each suffix and its grammatical function.",
-        "seed_url": "synthetic/tamil_lex",
-    },
-    {
-        "query": "Analyze the sandhi (புணர்ச்சி) in this compound.",
-        "seed_text": "கல்வி + நிலையம் = கல்வி நிலையம்",
-        "language": "ta",
-        "constraints": "Explain phonological changes.",
-        "seed_url": "synthetic/tamil_lex",
-    },
-]
-
-TELUGU_LEX_SEEDS = [
-    {
-        "query": "ఈ వాక్యంలో కర్త, క్రియ, కర్మను గుర్తించండి.",
-        "seed_text": "రాము పుస్తకం చదివాడు.",
-        "language": "te",
-        "constraints": "వ్याకరణ విశ్లేషణ చేయండి.",
-        "seed_url": "synthetic/telugu_lex",
-    },
-    {
-        "query": "Analyze the case markers and postpositions in this Telugu sentence.",
-        "seed_text": "పిల్లలు పాఠశాలకు వెళ్లారు.",
-        "language": "te",
-        "constraints": "Identify vibhakti (విభక్తి) markers.",
-        "seed_url": "synthetic/telugu_lex",
-    },
-    {
-        "query": "Break down this compound word into its morphological components.",
-        "seed_text": "విద్యాలయం (విద్య + ఆలయం)",
-        "language": "te",
-        "constraints": "Show sandhi rules applied.",
-        "seed_url": "synthetic/telugu_lex",
-    },
-]
-
-KANNADA_LEX_SEEDS = [
-    {
-        "query": "ಈ ವಾಕ್ಯದ ವ್ಯಾಕರಣ ವಿಶ್ಲೇಷಣೆ ಮಾಡಿ.",
-        "seed_text": "ಮಗು ಶಾಲೆಗೆ ಹೋಯಿತು.",
-        "language": "kn",
-        "constraints": "ಕರ್ತೃ, ಕ್ರಿಯಾಪದ, ಕರ್ಮವನ್ನು ಗುರುತಿಸಿ.",
-        "seed_url": "synthetic/kannada_lex",
-    },
-    {
-        "query": "Identify the vibhakti (case) markers in this Kannada sentence.",
-        "seed_text": "ಅವನು ಪುಸ್ತಕವನ್ನು ಮೇಜಿನ ಮೇಲೆ ಇಟ್ಟನು.",
-        "language": "kn",
-        "constraints": "Explain each postposition's function.",
-        "seed_url": "synthetic/kannada_lex",
-    },
-    {
-        "query": "Analyze this compound word formation.",
-        "seed_text": "ವಿದ್ಯಾಲಯ (ವಿದ್ಯೆ + ಆಲಯ)",
-        "language": "kn",
-        "constraints": "Show sandhi changes.",
-        "seed_url": "synthetic/kannada_lex",
-    },
-]
-
-BENGALI_LEX_SEEDS = [
-    {
-        "query": "এই বাক্যের ব্যাকরণগত বিশ্লেষণ করুন।",
-        "seed_text": "ছেলেটি স্কুলে গিয়েছিল।",
-        "language": "bn",
-        "constraints": "কর্তা, ক্রিয়া, কর্ম চিহ্নিত করুন।",
-        "seed_url": "synthetic/bengali_lex",
-    },
-    {
-        "query": "Identify the case markers and postpositions in this Bengali sentence.",
-        "seed_text": "আমি বাজার থেকে বই কিনেছি।",
-        "language": "bn",
-        "constraints": "Analyze vibhakti usage.",
-        "seed_url": "synthetic/bengali_lex",
-    },
-    {
-        "query": "Break down this sandhi compound.",
-        "seed_text": "বিদ্যালয় (বিদ্যা + আলয়)",
-        "language": "bn",
-        "constraints": "Show morpheme boundaries.",
-        "seed_url": "synthetic/bengali_lex",
-    },
-]
-
-PUNJABI_LEX_SEEDS = [
-    {
-        "query": "ਇਸ ਵਾਕ ਦਾ ਵਿਆਕਰਣਿਕ ਵਿਸ਼ਲੇਸ਼ਣ ਕਰੋ।",
-        "seed_text": "ਮੁੰਡਾ ਸਕੂਲ ਗਿਆ।",
-        "language": "pa",
-        "constraints": "ਕਰਤਾ, ਕਿਰਿਆ, ਕਰਮ ਪਛਾਣੋ।",
-        "seed_url": "synthetic/punjabi_lex",
-    },
-    {
-        "query": "Identify postpositions and case markers in this Punjabi sentence.",
-        "seed_text": "ਉਹ ਕਿਤਾਬ ਮੇਜ਼ ਉੱਤੇ ਰੱਖੀ।",
-        "language": "pa",
-        "constraints": "Analyze vibhakti markers.",
-        "seed_url": "synthetic/punjabi_lex",
-    },
-    {
-        "query": "Analyze this compound word.",
-        "seed_text": "ਵਿਦਿਆਲਾ (ਵਿਦਿਆ + ਆਲਾ)",
-        "language": "pa",
-        "constraints": "Show morphological structure.",
-        "seed_url": "synthetic/punjabi_lex",
-    },
-]
-
-# ── GENERAL SEEDS ────────────────────────────────────────────
-
-SEMANTIC_SEEDS = [
-    {
-        "query": "The trophy doesn't fit into the brown suitcase because it is too [large/small]. Which entity does 'it' refer to in each case?",
-        "seed_text": "Sentence 1: The trophy doesn't fit into the brown suitcase because it is too large.\nSentence 2: The trophy doesn't fit into the brown suitcase because it is too small.",
-        "language": "en",
-        "constraints": "This is a Winograd-style coreference problem.",
-        "seed_url": "synthetic/semantic",
-    },
-    {
-        "query": "The town councillors refused the demonstrators a permit because they feared violence. Who feared violence?",
-        "seed_text": "The town councillors refused the demonstrators a permit because they feared violence.",
-        "language": "en",
-        "constraints": "Resolve the pronoun 'they'.",
-        "seed_url": "synthetic/semantic",
-    },
-    {
-        "query": "The man planted the tree because it was Arbor Day. What is the cause and what is the effect?",
-        "seed_text": "",
-        "language": "en",
-        "constraints": "COPA-style causal reasoning.",
-        "seed_url": "synthetic/semantic",
-    },
-]
-
-SUMMARIZATION_SEEDS = [
-    {
-        "query": "Summarise this passage.",
-        "seed_text": (
-            "The Indian Space Research Organisation (ISRO) successfully launched "
-            "the Chandrayaan-3 mission on July 14, 2023. The spacecraft entered "
-            "lunar orbit on August 5 and the Vikram lander made a successful soft "
-            "landing near the lunar south pole on August 23, making India the "
-            "fourth country to land on the Moon and the first to land near the "
-            "south pole. The Pragyan rover was deployed shortly after landing and "
-            "conducted experiments on the lunar surface for about two weeks."
-        ),
-        "language": "en",
-        "constraints": "2-3 sentences",
-        "seed_url": "wikipedia/Chandrayaan-3",
-    },
-]
-
-PARAPHRASE_SEEDS = [
-    {
-        "query": "Rewrite preserving meaning, changing at least 60% of words.",
-        "seed_text": "The rapid advancement of artificial intelligence has raised concerns about job displacement across multiple industries.",
-        "language": "en",
-        "constraints": "",
-        "seed_url": "synthetic/paraphrase",
-    },
-]
-
-RAG_SEEDS = [
-    {
-        "query": "What was the primary cause of the fall of the Western Roman Empire?",
-        "seed_text": (
-            "[Source 1] The fall of the Western Roman Empire in 476 AD was driven by "
-            "a combination of internal decay and external pressures. Economic troubles, "
-            "including heavy taxation and inflation, weakened the empire from within.\n\n"
-            "[Source 2] Barbarian invasions, particularly by the Visigoths, Vandals, and "
-            "Ostrogoths, put enormous military pressure on Roman borders. The sack of "
-            "Rome in 410 AD by Alaric I was a pivotal moment.\n\n"
-            "[Source 3] Political instability, with over 20 emperors in 75 years during "
-            "the Crisis of the Third Century, prevented effective governance."
-        ),
-        "language": "en",
-        "constraints": "Cite sources using [Source N] notation.",
-        "seed_url": "wikipedia/Fall_of_Roman_Empire",
-    },
-]
-
-CLASSIFICATION_SEEDS = [
-    {
-        "query": "",
-        "seed_text": "I absolutely loved this restaurant! The pasta was cooked to perfection and the service was outstanding.",
-        "language": "en",
-        "constraints": "positive, negative, neutral",
-        "seed_url": "synthetic/classification",
-    },
-    {
-        "query": "",
-        "seed_text": "The flight was delayed by 3 hours and nobody at the counter could give us any information.",
-        "language": "en",
-        "constraints": "positive, negative, neutral",
-        "seed_url": "synthetic/classification",
-    },
-]
-
-NER_SEEDS = [
-    {
-        "query": "",
-        "seed_text": "Sundar Pichai, CEO of Google, announced new AI features at the I/O conference in Mountain View, California on May 14, 2024.",
-        "language": "en",
-        "constraints": "PER, ORG, LOC, DATE, EVENT",
-        "seed_url": "synthetic/ner",
-    },
-    {
-        "query": "",
-        "seed_text": "नरेंद्र मोदी ने 15 अगस्त 2024 को लाल किले से भाषण दिया।",
-        "language": "hi",
-        "constraints": "PER, LOC, DATE",
-        "seed_url": "synthetic/ner",
-    },
-]
-
-TRANSLATION_SEEDS = [
-    {
-        "query": "Translate to Hindi. Preserve technical terms.",
-        "seed_text": "Machine learning models require large amounts of labeled data for supervised training.",
-        "language": "en",
-        "constraints": "",
-        "seed_url": "synthetic/translation",
-    },
-    {
-        "query": "Translate to English. Keep cultural context.",
-        "seed_text": "दीपावली भारत का सबसे बड़ा त्योहार है जो बुराई पर अच्छाई की जीत का प्रतीक है।",
-        "language": "hi",
-        "constraints": "",
-        "seed_url": "synthetic/translation",
-    },
-]
-
-CREATIVE_SEEDS = [
-    {
-        "query": "Write a short story (200-300 words) about an AI that discovers it can dream.",
-        "seed_text": "",
-        "language": "en",
-        "constraints": "Include: a moment of self-doubt, a sensory detail, dialogue.",
-        "seed_url": "synthetic/creative",
-    },
-]
-
-CAUSAL_SEEDS = [
-    {
-        "query": "Why does deforestation lead to increased flooding in downstream areas?",
-        "seed_text": (
-            "Forests act as natural sponges, absorbing rainfall through their root "
-            "systems and releasing water slowly into streams. Tree canopies intercept "
-            "rain, reducing the impact on soil. When forests are removed, soil becomes "
-            "compacted and less able to absorb water."
-        ),
-        "language": "en",
-        "constraints": "Trace the full causal chain.",
-        "seed_url": "wikipedia/Deforestation",
-    },
-]
-
-ANALOGY_SEEDS = [
-    {
-        "query": "Doctor is to Hospital as Teacher is to ___. Explain the analogical mapping.",
-        "seed_text": "",
-        "language": "en",
-        "constraints": "",
-        "seed_url": "synthetic/analogy",
-    },
-    {
-        "query": "Photosynthesis is to Plants as Digestion is to ___. Complete and explain.",
-        "seed_text": "",
-        "language": "en",
-        "constraints": "Map the structural relations.",
-        "seed_url": "synthetic/analogy",
-    },
-]
-
-SCIENTIFIC_PAPER_SEEDS = [
-    {
-        "query": "Summarize the methodology and key findings of this research abstract.",
-        "seed_text": (
-            "We investigated the efficacy of CRISPR-Cas9 gene editing in treating "
-            "sickle cell disease. 45 patients received modified hematopoietic stem "
-            "cells with corrected HBB gene. After 12 months, 93% showed normalized "
-            "hemoglobin levels with no adverse effects. Results suggest gene therapy "
-            "as a viable treatment option."
-        ),
-        "language": "en",
-        "constraints": "Identify: research question, methods, sample size, results, conclusion.",
-        "seed_url": "synthetic/scientific_papers",
-    },
-]
-
-# ── MULTILINGUAL SEMANTIC REASONING ──────────────────────────
-
-INDIAN_SEMANTIC_SEEDS = [
-    # Winograd Schemas (Coreference)
-    {
-        "query": "The trophy won't fit into the brown suitcase because it is too [large/small]. What does 'it' refer to?",
-        "seed_text": "Sentence A: ട്രോഫി തവിട്ടുനിറത്തിലുള്ള പെട്ടിയിൽ ഒതുങ്ങില്ല, കാരണം അത് വളരെ വലുതാണ്. (Tamil/Malayalam variant style)\nವಾಕ್ಯ: ಟ್ರೋಫಿಯು ಕಂದು ಬಣ್ಣದ ಪೆಟ್ಟಿಗೆಯಲ್ಲಿ ಹಿಡಿಯುವುದಿಲ್ಲ ಏಕೆಂದರೆ ಅದು ತುಂಬಾ ದೊಡ್ಡದಾಗಿದೆ.",
-        "language": "kn",
-        "constraints": "Resolve 'അത്/ಅದು' based on the adjective 'ದೊಡ್ಡದಾಗಿದೆ' (large).",
-        "seed_url": "synthetic/semantic/winograd",
-    },
-    {
-        "query": "The town councillors refused the demonstrators a permit because they [feared/advocated] violence. Who does 'they' refer to?",
-        "seed_text": "বাক্য: নগর পরিষদ বিক্ষোভকারীদের অনুমতি দিতে অস্বীকার করেছিল কারণ তারা সহিংসতাকে ভয় পেয়েছিল।",
-        "language": "bn",
-        "constraints": "Explain why 'তারা' refers to the councillors in the context of fearing violence.",
-        "seed_url": "synthetic/semantic/winograd",
-    },
-    # Cultural Idioms & Metaphors
-    {
-        "query": "Explain the metaphorical meaning of the phrase 'పెరటి చెట్టు వైద్యానికి పనికిరాదు' (The tree in the backyard is of no use for medicine).",
-        "seed_text": "Telugu Proverb: పెరటి చెట్టు వైద్యానికి పనికిరాదు.",
-        "language": "te",
-        "constraints": "Provide the literal meaning and the deep semantic interpretation regarding familiarity and lack of appreciation.",
-        "seed_url": "synthetic/semantic/idioms",
-    },
-    {
-        "query": "Explain the semantic mapping of the Tamil proverb 'தொட்டில் பழக்கம் சுடுகாடு மட்டும்' (Habits formed in the cradle last until the crematorium).",
-        "seed_text": "Tamil Proverb: தொட்டில் பழக்கம் சுடுகாடு மட்டும்.",
-        "language": "ta",
-        "constraints": "Analyze the permanence of early childhood habits and the lifecycle metaphor used.",
-        "seed_url": "synthetic/semantic/idioms",
-    },
-    # Causal & Counterfactual
-    {
-        "query": "If the monsoon had arrived earlier this year, how would it have affected the agricultural economy in Punjab?",
-        "seed_text": "ਜੇ ਇਸ ਸਾਲ ਮਾਨਸੂਨ ਜਲਦੀ ਆ ਜਾਂਦਾ, ਤਾਂ ਪੰਜਾਬ ਦੀ ਖੇਤੀਬਾੜੀ ਆਰਥਿਕਤਾ 'ਤੇ ਇਸਦਾ ਕੀ ਪ੍ਰਭਾਵ ਪੈਂਦਾ?",
-        "language": "pa",
-        "constraints": "Reason through the causal chain of crop cycles (Kharif), irrigation costs, and market prices.",
-        "seed_url": "synthetic/semantic/causal",
-    },
-    {
-        "query": "Analyze the cause-effect relationship: The rise of digital payments in rural India has decreased the reliance on local moneylenders.",
-        "seed_text": "భారతదేశంలోని గ్రామీణ ప్రాంతాల్లో డిజిటల్ చెల్లింపుల పెరుగుదల స్థానిక వడ్డీ వ్యాపారులపై ఆధారపడటాన్ని తగ్గించింది.",
-        "language": "te",
-        "constraints": "Discuss accessibility, transparency, and financial inclusion as intermediary variables.",
-        "seed_url": "synthetic/semantic/causal",
-    }
-]
+# Each bank is a file in seeds/ with the fields query, seed_text,
+# language, constraints, seed_url, parsed on first use: <name>.jsonl (one
+# seed per line), or <name>.parquet for large banks — read column-wise
+# with no per-row JSON parsing, and preferred when both exist.
+SEEDS_DIR = Path(__file__).with_name("seeds")
+
+
+def _bank_path(name: str) -> Path | None:
+    for ext in (".parquet", ".jsonl"):
+        path = SEEDS_DIR / f"{name}{ext}"
+        if path.is_file():
+            return path
+    return None
+
+
+@functools.lru_cache(maxsize=None)
+def _read_bank(name: str) -> "SeedBank":
+    """
+    Parse a bank file once into a (cached) SeedBank; JSONL row dicts are
+    dropped as soon as their fields are in the columns.
+    """
+    path = _bank_path(name)
+    if path is None:
+        raise FileNotFoundError(SEEDS_DIR / f"{name}.jsonl")
+    if path.suffix == ".parquet":
+        import pyarrow.parquet as pq
+
+        table = pq.read_table(path)
+        return SeedBank(*(
+            table.column(field).to_pylist() if field in table.column_names
+            else [""] * table.num_rows
+            for field in SeedBank.FIELDS
+        ))
+    with open(path, "rb") as f:
+        data = f.read()
+    return SeedBank.from_rows(
+        [_json_loads(line) for line in data.splitlines() if line.strip()]
+    )
+
+
+def __getattr__(name: str) -> list[dict]:
+    # The former module constants (MATH_SEEDS, HINDI_LEX_SEEDS, ...) load
+    # their bank lazily; each access returns fresh copies.
+    if name.endswith("_SEEDS"):
+        bank = name[:-len("_SEEDS")].lower()
+        if _bank_path(bank) is not None:
+            return list(_read_bank(bank))
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 # ════════════════════════════════════════════════════════════
 # Seed source → bank mapping
 # ════════════════════════════════════════════════════════════
 
+# Source → bank names, concatenated in order
 SEED_BANKS = {
     # Mathematics
-    "math_problems":        MATH_SEEDS,
-    "math_textbooks":       MATH_TEXTBOOK_SEEDS,
+    "math_problems":        ("math",),
+    "math_textbooks":       ("math_textbook",),
     
     # Logic & Reasoning
-    "logic_puzzles":        LOGIC_SEEDS,
+    "logic_puzzles":        ("logic",),
     
     # Science Domains
-    "physics_problems":     PHYSICS_SEEDS,
-    "chemistry_problems":   CHEMISTRY_SEEDS,
-    "biology_problems":     BIOLOGY_SEEDS,
+    "physics_problems":     ("physics",),
+    "chemistry_problems":   ("chemistry",),
+    "biology_problems":     ("biology",),
     
     # Legal & Ethics
-    "legal_cases":          LEGAL_SEEDS,
-    "legal_documents":      LEGAL_SEEDS,
-    "ethical_dilemmas":     ETHICS_SEEDS,
+    "legal_cases":          ("legal",),
+    "legal_documents":      ("legal",),
+    "ethical_dilemmas":     ("ethics",),
     
     # Coding & Software
-    "github_repos":         CODING_SEEDS,
+    "github_repos":         ("coding",),
     
     # Politics & News
-    "political_texts":      POLITICS_SEEDS,
-    "news_articles":        NEWS_SEEDS + SUMMARIZATION_SEEDS,
+    "political_texts":      ("politics",),
+    "news_articles":        ("news", "summarization"),
     
     # Indian Languages - Lexical/Syntactic
-    "hindi_wikipedia":      HINDI_LEX_SEEDS,
-    "tamil_wikipedia":      TAMIL_LEX_SEEDS,
-    "telugu_wikipedia":     TELUGU_LEX_SEEDS,
-    "kannada_wikipedia":    KANNADA_LEX_SEEDS,
-    "bengali_wikipedia":    BENGALI_LEX_SEEDS,
-    "punjabi_wikipedia":    PUNJABI_LEX_SEEDS,
+    "hindi_wikipedia":      ("hindi_lex",),
+    "tamil_wikipedia":      ("tamil_lex",),
+    "telugu_wikipedia":     ("telugu_lex",),
+    "kannada_wikipedia":    ("kannada_lex",),
+    "bengali_wikipedia":    ("bengali_lex",),
+    "punjabi_wikipedia":    ("punjabi_lex",),
     
     # General Sources
-    "wikipedia_vital":      SEMANTIC_SEEDS + CAUSAL_SEEDS + SUMMARIZATION_SEEDS + PARAPHRASE_SEEDS + RAG_SEEDS + INDIAN_SEMANTIC_SEEDS,
-    "indian_semantics":     INDIAN_SEMANTIC_SEEDS,
-    "wiktionary":           HINDI_LEX_SEEDS + TAMIL_LEX_SEEDS + TELUGU_LEX_SEEDS + KANNADA_LEX_SEEDS + BENGALI_LEX_SEEDS + PUNJABI_LEX_SEEDS,
-    "story_seeds":          CREATIVE_SEEDS,
-    "labeled_text":         CLASSIFICATION_SEEDS,
-    "concept_pairs":        ANALOGY_SEEDS,
-    "parallel_corpus":      TRANSLATION_SEEDS,
-    "scientific_papers":    SCIENTIFIC_PAPER_SEEDS,
+    "wikipedia_vital":      ("semantic", "causal", "summarization", "paraphrase", "rag", "indian_semantic"),
+    "indian_semantics":     ("indian_semantic",),
+    "wiktionary":           ("hindi_lex", "tamil_lex", "telugu_lex", "kannada_lex", "bengali_lex", "punjabi_lex"),
+    "story_seeds":          ("creative",),
+    "labeled_text":         ("classification",),
+    "concept_pairs":        ("analogy",),
+    "parallel_corpus":      ("translation",),
+    "scientific_papers":    ("scientific_paper",),
 }
 
 
-def get_seeds(skill_cfg: dict, limit: int | None = None) -> list[dict]:
-    """Return seeds for a skill config, optionally limited."""
+def _hash_input(query: str, seed_text: str) -> bytes:
+    """The seed-specific part of the synth_id hash input."""
+    return f"{query}_{seed_text}".encode()  # one encode, one bytes object
+
+
+def _id_hasher(skill_id: str):
+    """
+    Return a function mapping a _hash_input() to the seed's synth_id.
+    IDs stay MD5-based (resume matches them against existing
+    checkpoints); the skill-id prefix is hashed once and copied per seed.
+    """
+    base = hashlib.md5(skill_id.encode() + b"_")
+    prefix = f"{skill_id}_"
+
+    def synth_id(data: bytes) -> str:
+        h = base.copy()
+        h.update(data)
+        return prefix + h.hexdigest()[:12]
+
+    return synth_id
+
+
+class SeedBank:
+    """
+    A seed bank stored column-wise: one tuple per seed field rather than
+    one dict per seed. Row dicts are built only on demand (iteration);
+    _build_seeds zips the columns directly. Immutable, so callers can
+    never alter the built-in templates.
+    """
+
+    FIELDS = ("query", "seed_text", "language", "constraints", "seed_url")
+    __slots__ = (
+        "queries", "seed_texts", "langs", "constraints", "urls",
+        "hash_inputs",
+    )
+
+    def __init__(self, queries, seed_texts, langs, constraints, urls):
+        self.queries = tuple(queries)
+        self.seed_texts = tuple(seed_texts)
+        # Closed sets of values: interned, so the rows of every bank share
+        # one object per value instead of one per parsed JSON line
+        self.langs = tuple(map(sys.intern, langs))
+        self.urls = tuple(map(sys.intern, urls))
+        # Constraint phrases often repeat verbatim ("", "Show all steps.");
+        # equal ones are folded into one object per bank
+        shared = {}
+        self.constraints = tuple(shared.setdefault(c, c) for c in constraints)
+        # synth_id hash inputs, encoded once per bank
+        self.hash_inputs = tuple(map(_hash_input, self.queries, self.seed_texts))
+
+    @classmethod
+    def from_rows(cls, rows) -> "SeedBank":
+        return cls(*(
+            tuple(r.get(field, "") for r in rows) for field in cls.FIELDS
+        ))
+
+    @classmethod
+    def concat(cls, banks: list["SeedBank"]) -> "SeedBank":
+        """
+        One bank holding the seeds of `banks`, in order. A seed listed in
+        more than one of them is kept once (it would repeat its synth_id);
+        the precomputed hash inputs serve as the dedup key.
+        """
+        seen = set()
+        rows = []
+        for bank in banks:
+            for values, key in zip(zip(*bank.columns), bank.hash_inputs):
+                if key not in seen:
+                    seen.add(key)
+                    rows.append(values)
+        return cls(*(zip(*rows) if rows else ((),) * len(cls.FIELDS)))
+
+    @property
+    def columns(self) -> tuple[tuple, ...]:
+        """The field columns, in FIELDS order."""
+        return (
+            self.queries, self.seed_texts, self.langs, self.constraints,
+            self.urls,
+        )
+
+    def __len__(self) -> int:
+        return len(self.queries)
+
+    def __iter__(self) -> Iterator[dict]:
+        for values in zip(*self.columns):
+            yield dict(zip(self.FIELDS, values))
+
+FALLBACK_BANK = ("semantic",)
+
+
+@functools.lru_cache(maxsize=None)
+def _load_bank(names: tuple[str, ...]) -> SeedBank:
+    if len(names) == 1:
+        return _read_bank(names[0])
+    return SeedBank.concat([_read_bank(name) for name in names])
+
+
+def get_bank(source: str) -> SeedBank | None:
+    """The SeedBank for a seed source (loaded on first use), or None."""
+    names = SEED_BANKS.get(source)
+    return _load_bank(names) if names else None
+
+
+def _skill_fields(skill_cfg: dict) -> dict:
+    """The skill metadata every seed of this skill carries."""
+    return {
+        "skill_id": skill_cfg["id"],
+        "category": skill_cfg["category"],
+        "band": skill_cfg["band"],
+        "benchmarks": skill_cfg["benchmarks"],
+        "cot_style": skill_cfg["cot_style"],
+        "stages": skill_cfg["stages"],
+    }
+
+
+# skill_cfg fields get_seeds depends on (its cache key)
+_SKILL_KEYS = (
+    "id", "category", "band", "benchmarks", "cot_style", "stages",
+    "seed_source",
+)
+
+
+def get_seeds(
+    skill_cfg: dict, limit: int | None = None, copy: bool = True,
+) -> list:
+    """
+    Return seeds for a skill config, optionally limited. Built once per
+    (skill, limit) and cached; each call returns fresh copies — list
+    fields (band, benchmarks, stages) included — so callers may modify
+    them. copy=False returns the cached read-only mappings themselves,
+    whose lists are shared, for callers that only read seeds.
+    """
+    # List fields (band, benchmarks, stages) become tuples to be hashable
+    key = tuple(
+        tuple(v) if isinstance(v, list) else v
+        for v in (skill_cfg[k] for k in _SKILL_KEYS)
+    )
+    seeds = _build_seeds(key, limit or None)
+    if not copy:
+        return list(seeds)
+    # Copy the lists too: they are shared by every cached seed
+    return [
+        {k: list(v) if isinstance(v, list) else v for k, v in s.items()}
+        for s in seeds
+    ]
+
+
+# Unknown seed sources already warned about (once per source)
+_warned_sources: set[str] = set()
+
+
+@functools.lru_cache(maxsize=256)
+def _build_seeds(
+    skill_key: tuple, limit: int | None,
+) -> tuple[MappingProxyType, ...]:
+    skill_cfg = {
+        k: list(v) if isinstance(v, tuple) else v
+        for k, v in zip(_SKILL_KEYS, skill_key)
+    }
     source = skill_cfg["seed_source"]
-    bank = SEED_BANKS.get(source, [])
+    bank = get_bank(source)
     if not bank:
-        print(f"  [WARN] No seeds for source '{source}', using fallback.")
-        bank = SEMANTIC_SEEDS  # safe fallback
+        if source not in _warned_sources:
+            _warned_sources.add(source)
+            print(f"  [WARN] No seeds for source '{source}', using fallback.")
+        bank = _load_bank(FALLBACK_BANK)  # safe fallback
+    synth_id = _id_hasher(skill_cfg["id"])
+    tmpl = _skill_fields(skill_cfg)
+    # Rows are assembled straight from the bank's columns; only the seeds
+    # that will be returned are built
+    rows = zip(*bank.columns, bank.hash_inputs)
     seeds = []
-    for s in bank:
-        seed = {**s}  # copy
-        seed["skill_id"] = skill_cfg["id"]
-        seed["category"] = skill_cfg["category"]
-        seed["band"] = skill_cfg["band"]
-        seed["benchmarks"] = skill_cfg["benchmarks"]
-        seed["cot_style"] = skill_cfg["cot_style"]
-        seed["stages"] = skill_cfg["stages"]
-        # generate deterministic ID
-        h = hashlib.md5(
-            f"{skill_cfg['id']}_{s.get('query','')}_{s.get('seed_text','')}".encode()
-        ).hexdigest()[:12]
-        seed["synth_id"] = f"{skill_cfg['id']}_{h}"
-        seeds.append(seed)
-    if limit:
-        seeds = seeds[:limit]
-    return seeds
+    for query, seed_text, language, constraints, seed_url, data in (
+        itertools.islice(rows, limit)
+    ):
+        seed = {
+            "query": query,
+            "seed_text": seed_text,
+            "language": language,
+            "constraints": constraints,
+            "seed_url": seed_url,
+            **tmpl,
+            "synth_id": synth_id(data),  # deterministic ID
+        }
+        seeds.append(MappingProxyType(seed))
+    return tuple(seeds)
+
+
+# ── Custom seeds ─────────────────────────────────────────────
+
+# Files larger than this are parsed by a process pool, in newline-aligned
+# byte ranges of CUSTOM_SEEDS_CHUNK; smaller ones stay in-process.
+CUSTOM_SEEDS_PARALLEL_MIN = 64 << 20
+CUSTOM_SEEDS_CHUNK = 8 << 20
+
+
+def _seed_builder(skill_cfg: dict):
+    """Return a function turning one raw custom-seed record into a seed."""
+    # Everything skill-level is resolved once, outside the per-row path
+    synth_id = _id_hasher(skill_cfg["id"])
+    tmpl = _skill_fields(skill_cfg)
+    hash_input, intern = _hash_input, sys.intern
+    shared = {}  # repeated constraint strings, folded per file
+
+    def build(raw: dict) -> dict:
+        get = raw.get
+        query = get("query", "")
+        # "text" is only looked up when "seed_text" is absent
+        seed_text = raw["seed_text"] if "seed_text" in raw else get("text", "")
+        # Few distinct values across a corpus: share one string object each
+        language = get("language", "en")
+        seed_url = get("source", "custom")
+        if type(language) is str:
+            language = intern(language)
+        if type(seed_url) is str:
+            seed_url = intern(seed_url)
+        constraints = get("constraints", "")
+        if type(constraints) is str:
+            constraints = shared.setdefault(constraints, constraints)
+        return {
+            "query": query,
+            "seed_text": seed_text,
+            "language": language,
+            "constraints": constraints,
+            "seed_url": seed_url,
+            **tmpl,
+            "synth_id": synth_id(hash_input(query, seed_text)),
+        }
+
+    return build
+
+
+def _seed_parser(skill_cfg: dict):
+    """Return a function turning one JSONL line into a seed (None if blank)."""
+    build, loads = _seed_builder(skill_cfg), _json_loads
+
+    def parse(line: bytes) -> dict | None:
+        return build(loads(line)) if line.strip() else None
+
+    return parse
+
+
+_worker_parse = None  # set per pool worker by _init_seed_worker
+
+
+def _init_seed_worker(skill_cfg: dict) -> None:
+    global _worker_parse
+    _worker_parse = _seed_parser(skill_cfg)
+
+
+def _parse_range(path: str, start: int, end: int) -> list[dict]:
+    with open(path, "rb") as f:
+        f.seek(start)
+        lines = f.read(end - start).splitlines()
+    return [s for s in map(_worker_parse, lines) if s is not None]
+
+
+def _line_ranges(path: str, chunk: int) -> list[tuple[int, int]]:
+    """Split a file into byte ranges of ~chunk bytes ending on newlines."""
+    with open(path, "rb") as f, mmap.mmap(
+        f.fileno(), 0, access=mmap.ACCESS_READ,
+    ) as mm:
+        size = len(mm)
+        ranges, pos = [], 0
+        while pos < size:
+            end = mm.find(b"\n", min(pos + chunk, size))
+            end = size if end < 0 else end + 1
+            ranges.append((pos, end))
+            pos = end
+    return ranges
+
+
+def iter_custom_seeds(jsonl_path: str, skill_cfg: dict) -> Iterator[dict]:
+    """
+    Stream seeds from a user-provided JSONL (or Parquet) file, in file
+    order, dropping repeats of an earlier (query, seed_text) pair — they
+    share a synth_id.
+    """
+    seen = set()
+    dupes = 0
+    for seed in _parse_custom_seeds(jsonl_path, skill_cfg):
+        sid = seed["synth_id"]
+        if sid in seen:
+            dupes += 1
+            continue
+        seen.add(sid)
+        yield seed
+    if dupes:
+        print(f"  [WARN] Skipped {dupes} duplicate seed(s) in {jsonl_path}.")
+
+
+def _parse_custom_seeds(jsonl_path: str, skill_cfg: dict) -> Iterator[dict]:
+    """
+    Parse every seed in the file, in order. Parquet files are read a
+    record batch at a time; large JSONL files are parsed in parallel by
+    worker processes, one chunk at a time.
+    """
+    if jsonl_path.endswith(".parquet"):
+        import pyarrow.parquet as pq
+
+        build = _seed_builder(skill_cfg)
+        for batch in pq.ParquetFile(jsonl_path).iter_batches():
+            for row in batch.to_pylist():
+                # A null cell counts as a missing key, as in JSONL
+                yield build({k: v for k, v in row.items() if v is not None})
+        return
+
+    if os.path.getsize(jsonl_path) > CUSTOM_SEEDS_PARALLEL_MIN:
+        from collections import deque
+        from concurrent.futures import ProcessPoolExecutor
+
+        workers = os.cpu_count() or 1
+        ranges = iter(_line_ranges(jsonl_path, CUSTOM_SEEDS_CHUNK))
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_seed_worker, initargs=(skill_cfg,),
+        ) as pool:
+            # At most 2 chunks per worker in flight, yielded in file order,
+            # so parsed seeds never pile up beyond that window
+            window = deque(
+                pool.submit(_parse_range, jsonl_path, start, end)
+                for start, end in itertools.islice(ranges, 2 * workers)
+            )
+            while window:
+                seeds = window.popleft().result()
+                for start, end in itertools.islice(ranges, 1):
+                    window.append(pool.submit(_parse_range, jsonl_path, start, end))
+                yield from seeds
+        return
+
+    parse = _seed_parser(skill_cfg)
+    # Parsed straight from bytes (orjson when installed)
+    with open(jsonl_path, "rb", buffering=1 << 20) as f:
+        for line in f:
+            seed = parse(line)
+            if seed is not None:
+                yield seed
 
 
 def load_custom_seeds(jsonl_path: str, skill_cfg: dict) -> list[dict]:
     """Load seeds from a user-provided JSONL file."""
-    seeds = []
-    with open(jsonl_path, "r", encoding="utf-8") as f:
-        for line in f:
-            raw = json.loads(line.strip())
-            seed = {
-                "query": raw.get("query", ""),
-                "seed_text": raw.get("seed_text", raw.get("text", "")),
-                "language": raw.get("language", "en"),
-                "constraints": raw.get("constraints", ""),
-                "seed_url": raw.get("source", "custom"),
-                "skill_id": skill_cfg["id"],
-                "category": skill_cfg["category"],
-                "band": skill_cfg["band"],
-                "benchmarks": skill_cfg["benchmarks"],
-                "cot_style": skill_cfg["cot_style"],
-                "stages": skill_cfg["stages"],
-            }
-            h = hashlib.md5(
-                f"{skill_cfg['id']}_{seed['query']}_{seed['seed_text']}".encode()
-            ).hexdigest()[:12]
-            seed["synth_id"] = f"{skill_cfg['id']}_{h}"
-            seeds.append(seed)
-    return seeds
+    return list(iter_custom_seeds(jsonl_path, skill_cfg))
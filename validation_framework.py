@@ -4,16 +4,24 @@ validation_framework.py — Quality & Diversity Validation Suite.
 This module provides tools to validate the performance of underlying models
 and the quality of generated synthetic data, specifically focusing on:
 1. Semantic consistency and linguistic fluency.
-2. Diversity of content (n-gram overlap).
+2. Diversity of content (n-gram overlap, embedding distances).
 3. Language-specificity and cultural nuances.
 """
 
+import functools
 import json
 import random
 import math
+import re
 import collections
 from pathlib import Path
-from model_manager import ModelManager
+from typing import TYPE_CHECKING, Iterable
+
+import numpy as np
+
+if TYPE_CHECKING:
+    # Only used in annotations; DiversityScorer needs no model backend
+    from model_manager import ModelManager
 
 class DiversityScorer:
     """Calculates n-gram diversity metrics for a set of samples."""
@@ -21,47 +29,218 @@ class DiversityScorer:
     def __init__(self, n=3):
         self.n = n
 
-    def calculate_vcore(self, samples: list[str]) -> float:
-        """Calculate the ratio of unique n-grams to total n-grams."""
-        if not samples:
-            return 0.0
-        
-        all_ngrams = []
+    def _ngrams(self, samples: Iterable[str]):
+        """
+        Per sample, (n-gram iterator, n-gram count); samples shorter than n
+        are skipped. N-grams are zipped from shifted views of the word list
+        (no slices, no list).
+        """
         for text in samples:
             words = text.split()
-            if len(words) < self.n:
-                continue
-            ngrams = [tuple(words[i:i+self.n]) for i in range(len(words)-self.n+1)]
-            all_ngrams.extend(ngrams)
-        
-        if not all_ngrams:
+            if len(words) >= self.n:
+                yield (
+                    zip(*(words[i:] for i in range(self.n))),
+                    len(words) - self.n + 1,
+                )
+
+    def calculate_vcore(self, samples: Iterable[str]) -> float:
+        """
+        Calculate the ratio of unique n-grams to total n-grams. `samples`
+        may be any iterable (e.g. a generator); it is read once.
+        """
+        # One streaming pass: n-grams go straight into a set and a count
+        unique_ngrams = set()
+        total = 0
+        for ngrams, count in self._ngrams(samples):
+            unique_ngrams.update(ngrams)
+            total += count
+
+        if not total:
             return 0.0
-            
-        unique_ngrams = set(all_ngrams)
-        return len(unique_ngrams) / len(all_ngrams)
+
+        return len(unique_ngrams) / total
+
+    def calculate_entropy(self, samples: Iterable[str]) -> float:
+        """
+        Shannon entropy (bits) of the n-gram frequency distribution. Use
+        score() when vcore is wanted too: it gives both from one pass.
+        """
+        return self.score(samples)["entropy"]
+
+    def score(self, samples: Iterable[str]) -> dict:
+        """
+        vcore and n-gram entropy from a single pass over `samples`: n-grams
+        are tallied in a Counter, and the entropy is one vectorised numpy
+        reduction over the counts at the end.
+        """
+        counts = collections.Counter()
+        total = 0
+        for ngrams, count in self._ngrams(samples):
+            counts.update(ngrams)
+            total += count
+
+        if not total:
+            return {"vcore": 0.0, "entropy": 0.0}
+
+        p = np.fromiter(counts.values(), dtype=np.float64, count=len(counts))
+        p /= total
+        return {
+            "vcore": len(counts) / total,
+            "entropy": float(-np.sum(p * np.log2(p))),
+        }
+
+class EmbeddingDiversity:
+    """
+    Remote-Clique (mean pairwise cosine distance) and Chamfer (mean
+    distance to the nearest other sample) over sentence embeddings.
+
+    Texts are encoded in batches into a float16 matrix of unit vectors;
+    the pairwise scan then runs as blocked float32 matrix products, so
+    only a block of rows of the N×N similarity matrix exists at a time.
+    The scan is O(N²), so validate_dataset embeds a uniform random subset
+    of at most `max_samples` texts. Needs `sentence-transformers`
+    (imported on first use).
+    """
+
+    DEFAULT_MODEL = "sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2"
+    BATCH_SIZE = 64
+    # 5k texts: a 5k×5k scan, well under a second
+    MAX_SAMPLES = 5000
+    # Upper bound on the similarity block held at once (bytes)
+    BLOCK_BYTES = 64 << 20
+
+    def __init__(
+        self, model_name: str = DEFAULT_MODEL, device: str | None = None,
+        max_samples: int = MAX_SAMPLES,
+    ):
+        self.model_name = model_name
+        self.device = device
+        self.max_samples = max_samples
+        self._model = None
+
+    def encode(self, texts: list[str]) -> np.ndarray:
+        """Unit-normalised float16 embeddings, encoded BATCH_SIZE at a time."""
+        if self._model is None:
+            from sentence_transformers import SentenceTransformer
+
+            print(f"[Validator] Loading embedding model {self.model_name} ...")
+            self._model = SentenceTransformer(self.model_name, device=self.device)
+        emb = self._model.encode(
+            texts,
+            batch_size=self.BATCH_SIZE,
+            convert_to_numpy=True,
+            normalize_embeddings=True,
+            show_progress_bar=False,
+        )
+        return emb.astype(np.float16)
+
+    @classmethod
+    def score_embeddings(cls, emb: np.ndarray) -> dict:
+        """Remote-Clique and Chamfer distances for unit-vector rows."""
+        n = len(emb)
+        if n < 2:
+            return {"remote_clique": 0.0, "chamfer": 0.0}
+
+        x = np.asarray(emb, dtype=np.float32)
+        step = max(1, cls.BLOCK_BYTES // (4 * n))
+        sim_sum = 0.0
+        nearest = np.empty(n, dtype=np.float32)
+        for start in range(0, n, step):
+            block = x[start:start + step] @ x.T
+            rows = np.arange(len(block))
+            diag = block[rows, start + rows]
+            sim_sum += float(block.sum(dtype=np.float64) - diag.sum(dtype=np.float64))
+            block[rows, start + rows] = -np.inf
+            nearest[start:start + step] = block.max(axis=1)
+
+        # float16 rounding can push a similarity a hair past 1
+        np.clip(nearest, -1.0, 1.0, out=nearest)
+        return {
+            "remote_clique": 1.0 - sim_sum / (n * (n - 1)),
+            "chamfer": float(1.0 - nearest.mean(dtype=np.float64)),
+        }
+
+_json_decoder = json.JSONDecoder()
+# Where a JSON object with at least one key could begin
+_OBJECT_START = re.compile(r'\{\s*"')
+
+def _extract_json(text: str) -> dict | None:
+    """
+    First JSON object embedded in `text`, or None. raw_decode() parses
+    from each candidate "{" in turn and stops at the object's closing
+    brace, so braces in surrounding prose (or inside the critique string)
+    don't break the match the way a find("{")/rfind("}") slice does.
+    Braces not followed by a quoted key are skipped without trying a
+    decode, so replies with no JSON raise no exceptions at all.
+    """
+    for m in _OBJECT_START.finditer(text):
+        try:
+            obj, _ = _json_decoder.raw_decode(text, m.start())
+        except ValueError:
+            continue
+        return obj
+    return None
+
+@functools.lru_cache(maxsize=256)
+def _judge_system_prompt(language: str, category: str) -> str:
+    """Judge system prompt; it only varies by (language, category)."""
+    return (
+        f"You are a rigorous data quality auditor proficient in {language}. "
+        f"Evaluate the following synthetic data sample designed for '{category}' tasks. "
+        "Score from 1 to 10 on four dimensions: \n"
+        "1. Fluency: Is the language natural and grammatically correct?\n"
+        "2. Semantic Consistency: Does the reasoning logically lead to the answer?\n"
+        "3. Domain Depth: Is the content technically accurate and insightful?\n"
+        "4. Language Specificity: Does it leverage culture/idioms/nuances of the target language (0 for general English)?"
+    )
 
 class QualityScorer:
     """Uses LLM-as-a-Judge to score synthetic samples."""
+
+    # generate() kwargs for every judge request
+    GEN_PARAMS = {"max_new_tokens": 500, "temperature": 0.1}
     
-    def __init__(self, model_manager: ModelManager, judge_model_cfg: dict):
+    def __init__(self, model_manager: "ModelManager", judge_model_cfg: dict):
         self.mm = model_manager
         self.cfg = judge_model_cfg
 
     def score_sample(self, seed: dict, completion: str) -> dict:
         """Rate a sample across multiple dimensions (1-10)."""
         self.mm.load(self.cfg)
-        
-        language = seed.get("language", "en")
-        category = seed.get("category", "General")
-        
-        system_prompt = (
-            f"You are a rigorous data quality auditor proficient in {language}. "
-            f"Evaluate the following synthetic data sample designed for '{category}' tasks. "
-            "Score from 1 to 10 on four dimensions: \n"
-            "1. Fluency: Is the language natural and grammatically correct?\n"
-            "2. Semantic Consistency: Does the reasoning logically lead to the answer?\n"
-            "3. Domain Depth: Is the content technically accurate and insightful?\n"
-            "4. Language Specificity: Does it leverage culture/idioms/nuances of the target language (0 for general English)?"
+        response_text = self.mm.generate(
+            self.build_messages(seed, completion), **self.GEN_PARAMS
+        )
+        return self.parse_score(response_text)
+
+    def iter_score_samples(self, pairs: list[tuple[dict, str]]):
+        """
+        Score many (seed, completion) pairs, yielding (index, score) as
+        each finishes. Requests go through ModelManager.iter_generate_many,
+        so an Ollama judge keeps several in flight and an HF judge with
+        batch_size > 1 scores padded batches.
+        """
+        self.mm.load(self.cfg)
+        # Submitted grouped by system prompt, so requests sharing it run
+        # back to back and reuse its prefill (llama.cpp / Ollama prompt
+        # cache; HF keeps a prefix KV per system prompt)
+        order = sorted(
+            range(len(pairs)),
+            key=lambda i: (
+                pairs[i][0].get("language", "en"),
+                pairs[i][0].get("category", "General"),
+            ),
+        )
+        messages_list = [self.build_messages(*pairs[i]) for i in order]
+        for j, response_text in self.mm.iter_generate_many(
+            messages_list, [self.GEN_PARAMS] * len(pairs)
+        ):
+            yield order[j], self.parse_score(response_text)
+
+    @staticmethod
+    def build_messages(seed: dict, completion: str) -> list[dict]:
+        """The judge prompt for one sample."""
+        system_prompt = _judge_system_prompt(
+            seed.get("language", "en"), seed.get("category", "General")
         )
         
         user_prompt = (
@@ -72,43 +251,81 @@ class QualityScorer:
             '{"fluency": X, "semantic_consistency": X, "domain_depth": X, "language_specificity": X, "total_score": X, "critique": "..."}'
         )
         
-        messages = [
+        return [
             {"role": "system", "content": system_prompt},
             {"role": "user", "content": user_prompt}
         ]
-        
-        response_text = self.mm.generate(messages, max_new_tokens=500, temperature=0.1)
-        
-        try:
-            # Attempt to extract JSON if model adds fluff
-            start = response_text.find("{")
-            end = response_text.rfind("}") + 1
-            if start != -1 and end != -1:
-                return json.loads(response_text[start:end])
+
+    @staticmethod
+    def parse_score(response_text: str) -> dict:
+        """The judge's JSON ratings, or an error dict."""
+        # Extract the JSON object even if the model adds fluff around it
+        score = _extract_json(response_text)
+        if score is None:
             return {"error": "Invalid JSON format from judge", "raw": response_text}
-        except Exception as e:
-            return {"error": str(e), "raw": response_text}
+        return score
 
 class ValidationFramework:
     """Main orchestration for data validation."""
     
-    def __init__(self, model_manager: ModelManager):
+    def __init__(self, model_manager: "ModelManager", embedding_model: str | None = None):
         self.mm = model_manager
         self.diversity_scorer = DiversityScorer()
+        # Embedding distances are opt-in: they need an encoder and are O(N²)
+        self.embedding_diversity = (
+            EmbeddingDiversity(embedding_model) if embedding_model else None
+        )
 
-    def validate_dataset(self, samples: list[dict], judge_cfg: dict, sample_size: int = 10) -> dict:
-        """Run validation on a subset of the generated dataset."""
-        if not samples:
+    def validate_dataset(self, samples: Iterable[dict], judge_cfg: dict, sample_size: int = 10) -> dict:
+        """
+        Run validation on a subset of the generated dataset. `samples` may
+        be any iterable; it is read once, so the dataset never has to be
+        held in memory.
+        """
+        # One pass: completions stream into the diversity scorer while a
+        # reservoir keeps a uniform random subset of samples to judge (and,
+        # if enabled, another one of completions to embed)
+        test_samples = []
+        embed_texts = []
+        seen = 0
+        embedder = self.embedding_diversity
+
+        def keep(reservoir: list, item, size: int) -> None:
+            if seen < size:
+                reservoir.append(item)
+            else:
+                j = random.randrange(seen + 1)
+                if j < size:
+                    reservoir[j] = item
+
+        def completions():
+            nonlocal seen
+            for s in samples:
+                keep(test_samples, s, sample_size)
+                if embedder is not None:
+                    keep(embed_texts, s["completion"], embedder.max_samples)
+                seen += 1
+                yield s["completion"]
+
+        diversity = self.diversity_scorer.score(completions())
+        if not seen:
             return {"error": "No samples provided"}
             
-        test_samples = random.sample(samples, min(len(samples), sample_size))
         quality_scorer = QualityScorer(self.mm, judge_cfg)
         
         results = {
-            "diversity_score": self.diversity_scorer.calculate_vcore([s["completion"] for s in samples]),
+            "diversity_score": diversity["vcore"],
+            "ngram_entropy": diversity["entropy"],
             "sample_quality": [],
             "averages": {}
         }
+        if embedder is not None:
+            print(f"[Validator] Embedding {len(embed_texts)} samples "
+                  f"with {embedder.model_name} ...")
+            results["embedding_diversity"] = {
+                **embedder.score_embeddings(embedder.encode(embed_texts)),
+                "samples": len(embed_texts),
+            }
         
         metrics = ["fluency", "semantic_consistency", "domain_depth", "language_specificity", "total_score"]
         sums = {m: 0.0 for m in metrics}
@@ -116,10 +333,16 @@ class ValidationFramework:
         
         print(f"[Validator] Scoring {len(test_samples)} samples using {judge_cfg['id']} ...")
         
-        for i, s in enumerate(test_samples):
-            print(f"  ({i+1}/{len(test_samples)}) Validating {s['skill_id']} ...")
-            score = quality_scorer.score_sample(s["seed"], s["completion"])
-            
+        # Judge requests run concurrently; results are kept in sample order
+        scores = [None] * len(test_samples)
+        pairs = [(s["seed"], s["completion"]) for s in test_samples]
+        for done, (i, score) in enumerate(
+            quality_scorer.iter_score_samples(pairs), 1
+        ):
+            print(f"  ({done}/{len(test_samples)}) Validated {test_samples[i]['skill_id']}")
+            scores[i] = score
+
+        for s, score in zip(test_samples, scores):
             if "error" not in score:
                 for m in metrics:
                     if m in score: